@@ -1,6 +1,6 @@
-from datetime import timedelta
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.helpers.config_validation as cv
 from homeassistant.const import Platform
@@ -9,7 +9,12 @@ from .const import (
     LOGGER,
     PLATFORMS,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_WATCH_SCAN_INTERVAL,
     DEFAULT_API_PROVIDER,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    SIGNAL_SYMBOLS_UPDATED,
+    SYMBOL_KEYS,
 )
 from .coordinator import ATWCoordinator
 from .services import async_setup_services, async_unload_services
@@ -38,14 +43,13 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         hass.data[DOMAIN]["coordinator"] = coordinator
         LOGGER.debug("Created global coordinator")
         await coordinator.data_store.async_load()
-        await coordinator.async_config_entry_first_refresh()
+        # Start from the last saved quotes; the live refresh runs in the background
+        await coordinator.async_restore_snapshot()
     else:
         coordinator = hass.data[DOMAIN]["coordinator"]
-        # Update coordinator's update interval if changed
-        update_interval = config_entry.options.get(
-            "update_interval", DEFAULT_SCAN_INTERVAL
-        )
-        await coordinator.async_set_update_interval(timedelta(minutes=update_interval))
+
+    # Register this entry's refresh tiers
+    _set_entry_intervals(coordinator, config_entry)
 
     # Store per-entry data
     entry_id = config_entry.entry_id
@@ -67,10 +71,15 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     if stored_entry_data:
         entry_data.update(stored_entry_data)
 
+    # Symbols edited in the options flow take precedence
+    for key in SYMBOL_KEYS:
+        if key in config_entry.options:
+            entry_data[key] = config_entry.options[key]
+
     hass.data[DOMAIN][entry_id] = entry_data
 
-    # Update coordinator's list of symbols and API providers
-    coordinator.update_symbols(hass.data[DOMAIN])
+    # Add this entry's symbols to the coordinator's index
+    coordinator.register_entry(entry_id, entry_data)
 
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
@@ -90,13 +99,54 @@ async def async_options_updated(hass: HomeAssistant, config_entry: ConfigEntry):
     # Retrieve the coordinator
     coordinator = hass.data[DOMAIN]["coordinator"]
 
-    # Get the new update_interval from options
-    update_interval = config_entry.options.get("update_interval", DEFAULT_SCAN_INTERVAL)
-    new_interval = timedelta(minutes=update_interval)
-    LOGGER.debug(f"Options updated: new update_interval={new_interval}")
+    LOGGER.debug(f"Options updated: {dict(config_entry.options)}")
+    entry_id = config_entry.entry_id
+    entry_data = hass.data[DOMAIN][entry_id]
 
-    # Update the coordinator's update_interval
-    await coordinator.async_set_update_interval(new_interval)
+    # Diff the tracked symbols so only added and removed ones are touched
+    old_symbols = {
+        asset_type: set(coordinator.symbol_index.entry_symbols(asset_type, entry_id))
+        for asset_type in ("stock", "crypto")
+    }
+    symbols_changed = False
+    for key in SYMBOL_KEYS:
+        symbols = config_entry.options.get(key)
+        if symbols is not None and symbols != entry_data.get(key):
+            entry_data[key] = symbols
+            symbols_changed = True
+    if symbols_changed:
+        coordinator.data_store.set_entry_data(entry_id, entry_data)
+        await coordinator.data_store.async_save()
+
+    # Only this entry's symbols are re-indexed and rescheduled
+    _set_entry_intervals(coordinator, config_entry)
+    coordinator.register_entry(entry_id, entry_data)
+
+    added = {}
+    removed = {}
+    for asset_type, symbols in old_symbols.items():
+        new_symbols = coordinator.symbol_index.entry_symbols(asset_type, entry_id)
+        added[asset_type] = [s for s in new_symbols if s not in symbols]
+        removed[asset_type] = [s for s in symbols if s not in new_symbols]
+    LOGGER.debug(f"Symbols updated for {entry_id}: added={added}, removed={removed}")
+    # Also sent without symbol changes, the entity layout may have changed
+    async_dispatcher_send(hass, SIGNAL_SYMBOLS_UPDATED.format(entry_id), added, removed)
+    # Fetch data for the new symbols only; they are the ones due now
+    if any(added.values()):
+        coordinator.async_schedule_startup_refresh()
+
+
+def _set_entry_intervals(coordinator: ATWCoordinator, config_entry: ConfigEntry):
+    """Pass the refresh tier options of an entry to the coordinator."""
+    options = config_entry.options
+    coordinator.set_entry_intervals(
+        config_entry.entry_id,
+        options.get("update_interval", DEFAULT_SCAN_INTERVAL),
+        options.get("watch_interval", DEFAULT_WATCH_SCAN_INTERVAL),
+        adaptive=options.get("adaptive_interval", False),
+        min_interval=options.get("min_update_interval", DEFAULT_ADAPTIVE_MIN_INTERVAL),
+        max_interval=options.get("max_update_interval", DEFAULT_ADAPTIVE_MAX_INTERVAL),
+    )
 
 
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
@@ -109,7 +159,7 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         hass.data[DOMAIN].pop(config_entry.entry_id)
         # Update coordinator's list of symbols
         coordinator = hass.data[DOMAIN]["coordinator"]
-        coordinator.update_symbols(hass.data[DOMAIN])
+        coordinator.unregister_entry(config_entry.entry_id)
 
         # If no other entries remain, remove the coordinator and services
         if len(hass.data[DOMAIN]) == 1:  # Only 'coordinator' remains
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from .const import (
+    LOGGER,
+    ADAPTIVE_INTERVAL_STEP,
+    ADAPTIVE_BACKOFF_FACTOR,
+)
+
+
+class ATWAdaptiveInterval:
+    """AIMD controller for the polling interval of one config entry.
+
+    Each healthy refresh shortens the interval by a fixed step (additive
+    increase of the request rate); a rate-limited refresh multiplies it
+    (multiplicative decrease), honouring any Retry-After the provider sent.
+    The interval always stays within the user's bounds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: timedelta,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        step: timedelta = ADAPTIVE_INTERVAL_STEP,
+        backoff_factor: float = ADAPTIVE_BACKOFF_FACTOR,
+    ):
+        """Initialize the controller at the initial interval."""
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.step = step
+        self.backoff_factor = backoff_factor
+        self.interval = self._clamp(initial)
+        self.increases = 0
+        self.backoffs = 0
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        """Return interval limited to the configured bounds."""
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record_healthy(self) -> bool:
+        """Shorten the interval after a healthy refresh; return True if it changed."""
+        interval = self._clamp(self.interval - self.step)
+        if interval == self.interval:
+            return False
+        self.interval = interval
+        self.increases += 1
+        return True
+
+    def record_throttled(self, retry_after: float = 0) -> bool:
+        """Back off after a rate-limited refresh; return True if it changed."""
+        interval = self._clamp(
+            max(self.interval * self.backoff_factor, timedelta(seconds=retry_after))
+        )
+        self.backoffs += 1
+        if interval == self.interval:
+            return False
+        LOGGER.info(f"{self.name}: rate limited, polling every {interval}")
+        self.interval = interval
+        return True
+
+    def stats(self) -> dict:
+        """Return the controller state for monitoring."""
+        return {
+            "interval": self.interval.total_seconds(),
+            "min_interval": self.min_interval.total_seconds(),
+            "max_interval": self.max_interval.total_seconds(),
+            "increases": self.increases,
+            "backoffs": self.backoffs,
+        }
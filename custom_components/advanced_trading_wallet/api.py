@@ -1,165 +1,387 @@
 import aiohttp
 import asyncio
+import random
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
 from .const import (
-    YAHOO_FINANCE_BASE_URL,
-    YAHOO_FINANCE_HISTORICAL_URL,
-    COINGECKO_BASE_URL,
     YAHOO_HEADERS,
     GET_CRUMB_URL,
+    YAHOO_AUTH_STORAGE_KEY,
+    YAHOO_AUTH_STORAGE_VERSION,
     LOGGER,
     DEFAULT_RETRY_AFTER,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_BACKOFF,
+    DEFAULT_RETRY_BACKOFF_MAX,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
 )
+from .cache import ATWResponseCache
+from .circuit_breaker import ATWCircuitBreaker
+from .providers import get_provider
+from .rate_limit import ATWRateLimiter
+
+
+class ATWAuthError(Exception):
+    """Raised when a provider rejects the request credentials (401/403)."""
+
+
+class ATWRequestCancelled(Exception):
+    """Set on a shared request whose owner was cancelled before it finished."""
 
 
 class ATWAPIClient:
     """API client to fetch stock and crypto data."""
 
-    def __init__(self, hass: HomeAssistant, api_provider: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_provider: str,
+        batch_size: int | None = None,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        session: aiohttp.ClientSession | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
         """Initialize the API client."""
         self.hass = hass
         self.api_provider = api_provider
+        self.provider = get_provider(api_provider)
+        if self.provider is None:
+            raise ValueError(f"Unknown API provider: {api_provider}")
+        self.batch_size = max(1, batch_size or self.provider.batch_size)
+        self.request_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+        rate_limit = self.provider.rate_limit
+        self.rate_limiter = ATWRateLimiter(
+            api_provider, rate_limit["rate"], rate_limit["capacity"]
+        )
+        self.circuit_breaker = ATWCircuitBreaker(api_provider)
+        self.response_cache = ATWResponseCache()
+        self._in_flight = {}
+        self.coalesced_requests = 0
+        self.requests_sent = 0
+        self.max_retries = max(0, max_retries)
+        self.request_timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
         self.crumb = None
         self.cookies = None
-        self.session = aiohttp.ClientSession()
+        self._auth_store = Store(
+            hass, YAHOO_AUTH_STORAGE_VERSION, YAHOO_AUTH_STORAGE_KEY
+        )
+        self._auth_loaded = False
+        self._crumb_lock = asyncio.Lock()
+        # Reuse Home Assistant's pooled connector (keep-alive, DNS cache) so
+        # connections survive across refresh cycles and historical calls
+        self._owns_session = session is None
+        self.session = session or async_create_clientsession(hass)
 
     async def get_stock_data(self, stock_symbol: str):
         """Fetch stock data asynchronously."""
-        if self.api_provider == "Yahoo Finance":
-            return await self._fetch_yahoo_stock(stock_symbol)
-        return None
+        return (await self.get_stocks_data([stock_symbol])).get(stock_symbol)
+
+    async def get_stocks_data(self, stock_symbols: list[str], results=None):
+        """Fetch stock data for several symbols, keyed by symbol.
+
+        Symbols are added to results as soon as their chunk arrives, so a caller
+        that stops waiting still keeps the symbols fetched so far.
+        """
+        results = {} if results is None else results
+        if self.provider.supports("stock"):
+            await self.provider.async_fetch_quotes(self, "stock", stock_symbols, results)
+        return results
 
     async def get_crypto_data(self, crypto_symbol: str, currency: str = "usd"):
         """Fetch crypto data asynchronously."""
-        if self.api_provider == "CoinGecko":
-            return await self._fetch_coingecko_crypto(crypto_symbol, currency)
-        return None
-
-    async def _fetch_yahoo_crumb(self):
-        """Fetch crumb and cookies from Yahoo Finance."""
-        if self.crumb:
-            LOGGER.debug("Using cached crumb.")
+        return (await self.get_cryptos_data([crypto_symbol], currency)).get(
+            crypto_symbol
+        )
+
+    async def get_cryptos_data(
+        self, crypto_symbols: list[str], currency: str = "usd", results=None
+    ):
+        """Fetch crypto data for several coins, keyed by symbol.
+
+        Coins are added to results as soon as their page arrives.
+        """
+        results = {} if results is None else results
+        if self.provider.supports("crypto"):
+            await self.provider.async_fetch_quotes(
+                self, "crypto", crypto_symbols, results, currency
+            )
+        return results
+
+    async def _acquire_slot(self, label: str) -> bool:
+        """Wait for a rate limit slot, or report that the request is deferred."""
+        if await self.rate_limiter.async_acquire():
             return True
+        LOGGER.warning(
+            f"Rate limit budget exhausted for {self.api_provider}, deferring {label}."
+        )
+        return False
+
+    def _defer_rate_limited(self, response, label: str):
+        """Record a 429 response so later requests wait for the Retry-After slot."""
+        try:
+            retry_after = float(
+                response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
+            )
+        except ValueError:
+            retry_after = DEFAULT_RETRY_AFTER
+        self.rate_limiter.defer(retry_after)
+        LOGGER.warning(
+            f"Rate limit hit for {label}. Deferring {self.api_provider} requests for {retry_after} seconds."
+        )
+
+    async def async_get_json(self, url: str, label: str, **kwargs):
+        """GET a JSON document, sharing one request among identical callers.
+
+        Concurrent calls for the same normalized URL await the response of the
+        first call instead of sending duplicate requests. If that call is
+        cancelled, the callers that joined it send their own request.
+        """
+        key = self.response_cache.normalize_url(url)
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced_requests += 1
+            LOGGER.debug(f"Joining in-flight request for {label}.")
+            try:
+                return await asyncio.shield(in_flight)
+            except ATWRequestCancelled:
+                LOGGER.debug(f"Shared request for {label} was cancelled, retrying.")
+                return await self.async_get_json(url, label, **kwargs)
+
+        future = self.hass.loop.create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._async_fetch_json(url, label, **kwargs)
+        except asyncio.CancelledError:
+            # Only this caller was cancelled, not the callers that joined it
+            future.set_exception(ATWRequestCancelled(label))
+            future.exception()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # Mark the exception as retrieved when nobody joined the request
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _async_fetch_json(
+        self,
+        url: str,
+        label: str,
+        headers=None,
+        cookies=None,
+        raise_on_auth=False,
+        ttl: float | None = None,
+    ):
+        """GET a JSON document through the cache, rate limiter and circuit breaker.
+
+        Responses are cached for ttl seconds when ttl is given. Expired entries
+        are revalidated with If-None-Match/If-Modified-Since when the upstream
+        sent validators.
+        """
+        cache_key = cache_entry = None
+        if ttl is not None:
+            cache_key = self.response_cache.normalize_url(url)
+            cache_entry = self.response_cache.get(cache_key)
+            if cache_entry is not None and cache_entry.is_fresh:
+                self.response_cache.hits += 1
+                return cache_entry.data
+            self.response_cache.misses += 1
+            if cache_entry is not None and cache_entry.conditional_headers():
+                headers = {**(headers or {}), **cache_entry.conditional_headers()}
+
+        if not self.circuit_breaker.allow_request():
+            LOGGER.debug(f"{self.api_provider} circuit is open, skipping {label}.")
+            return None
+
+        # Any exit that neither records a success nor a failure, including a
+        # cancelled refresh or an undecodable body, gives the probe slot back
+        judged = False
+        try:
+            error = None
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    # Exponential backoff with full jitter
+                    backoff = min(
+                        DEFAULT_RETRY_BACKOFF_MAX,
+                        DEFAULT_RETRY_BACKOFF * 2 ** (attempt - 1),
+                    )
+                    await asyncio.sleep(random.uniform(0, backoff))
+                if not await self._acquire_slot(label):
+                    return None
+                try:
+                    self.requests_sent += 1
+                    async with self.session.get(
+                        url,
+                        headers=headers,
+                        cookies=cookies,
+                        timeout=self.request_timeout,
+                    ) as response:
+                        if response.status == 429:
+                            self._defer_rate_limited(response, label)
+                            return None
+                        if response.status == 304 and cache_entry is not None:
+                            judged = True
+                            self.circuit_breaker.record_success()
+                            self.response_cache.refresh(cache_key, ttl)
+                            return cache_entry.data
+                        if response.status == 200:
+                            json_data = await response.json()
+                            judged = True
+                            self.circuit_breaker.record_success()
+                            if cache_key is not None:
+                                self.response_cache.set(
+                                    cache_key,
+                                    json_data,
+                                    ttl,
+                                    etag=response.headers.get("ETag"),
+                                    last_modified=response.headers.get(
+                                        "Last-Modified"
+                                    ),
+                                )
+                            return json_data
+                        if raise_on_auth and response.status in (401, 403):
+                            raise ATWAuthError(f"{label}: HTTP {response.status}")
+                        if response.status < 500:
+                            LOGGER.error(
+                                f"Failed to fetch data for {label}: {response.status}"
+                            )
+                            return None
+                        error = f"HTTP {response.status}"
+                except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as err:
+                    error = repr(err)
+                except aiohttp.ClientError as err:
+                    LOGGER.error(f"Failed to fetch data for {label}: {err}")
+                    return None
+                LOGGER.debug(
+                    f"Transient error fetching {label} (attempt {attempt + 1}): {error}"
+                )
+
+            LOGGER.error(
+                f"Failed to fetch data for {label} after {self.max_retries + 1} attempts: {error}"
+            )
+            judged = True
+            self.circuit_breaker.record_failure()
+            return None
+        finally:
+            if not judged:
+                self.circuit_breaker.release()
+
+    async def _async_load_yahoo_auth(self):
+        """Load the persisted crumb and cookies once per client."""
+        self._auth_loaded = True
+        stored = await self._auth_store.async_load()
+        if stored and stored.get("crumb"):
+            self.crumb = stored["crumb"]
+            self.cookies = stored.get("cookies") or None
+            LOGGER.debug("Loaded stored Yahoo Finance crumb.")
 
-        url = GET_CRUMB_URL
-        headers = YAHOO_HEADERS
+    async def _fetch_yahoo_crumb(self, stale_crumb: str | None = None):
+        """Fetch crumb and cookies from Yahoo Finance.
 
-        async with self.session.get(url, headers=headers) as response:
-            if response.status == 200:
-                text = await response.text()
-                self.crumb = text.strip()
-                self.cookies = response.cookies
-                LOGGER.debug(f"Fetched Yahoo Finance crumb: {self.crumb}")
+        Concurrent callers share a single fetch. Passing stale_crumb forces a
+        refresh unless another caller already replaced that crumb.
+        """
+        async with self._crumb_lock:
+            if not self._auth_loaded:
+                await self._async_load_yahoo_auth()
+            if self.crumb and self.crumb != stale_crumb:
+                LOGGER.debug("Using cached crumb.")
                 return True
-            else:
-                LOGGER.error(f"Failed to fetch Yahoo Finance crumb: {response.status}")
+
+            self.crumb = None
+            url = GET_CRUMB_URL
+            headers = YAHOO_HEADERS
+
+            try:
+                self.requests_sent += 1
+                async with self.session.get(
+                    url, headers=headers, timeout=self.request_timeout
+                ) as response:
+                    if response.status == 200:
+                        text = await response.text()
+                        self.crumb = text.strip()
+                        self.cookies = {
+                            name: morsel.value
+                            for name, morsel in response.cookies.items()
+                        } or None
+                        LOGGER.debug(f"Fetched Yahoo Finance crumb: {self.crumb}")
+                    else:
+                        LOGGER.error(
+                            f"Failed to fetch Yahoo Finance crumb: {response.status}"
+                        )
+                        return False
+            except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+                LOGGER.error(f"Failed to fetch Yahoo Finance crumb: {err!r}")
                 return False
 
-    async def _fetch_yahoo_stock(self, stock_symbol: str):
-        """Fetch stock data with crumb handling."""
+            await self._auth_store.async_save(
+                {"crumb": self.crumb, "cookies": self.cookies}
+            )
+            return True
+
+    async def async_get_yahoo_json(self, build_url, label: str, ttl=None):
+        """GET a Yahoo Finance document, refreshing the crumb once on 401/403."""
         if not self.crumb:
             await self._fetch_yahoo_crumb()
 
-        url = f"{YAHOO_FINANCE_BASE_URL}{stock_symbol}&crumb={self.crumb}"
-        async with self.session.get(
-            url, headers=YAHOO_HEADERS, cookies=self.cookies
-        ) as response:
-            if response.status == 429:
-                retry_after = int(
-                    response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
-                )
-                LOGGER.warning(
-                    f"Rate limit hit for {stock_symbol}. Retrying after {retry_after} seconds."
-                )
-                await asyncio.sleep(retry_after)
-                return None
-            if response.status == 200:
-                json_data = await response.json()
-                LOGGER.debug(f"Stock data for {stock_symbol}: {json_data}")
-                return json_data
-            else:
-                LOGGER.error(f"Failed to fetch stock data: {response.status}")
-                return None
-
-    async def _fetch_coingecko_crypto(self, crypto_symbol: str, currency: str = "usd"):
-        crypto_symbol_lower = crypto_symbol.lower()
-        url = f"{COINGECKO_BASE_URL}/coins/markets?vs_currency={currency}&ids={crypto_symbol_lower}"
-        async with self.session.get(url) as response:
-            if response.status == 429:
-                retry_after = int(
-                    response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
-                )
-                LOGGER.warning(
-                    f"Rate limit hit for {crypto_symbol}. Retrying after {retry_after} seconds."
-                )
-                await asyncio.sleep(retry_after)
-                return None
-            if response.status == 200:
-                json_data = await response.json()
-                if json_data:
-                    # Retrieve the symbol from the response
-                    symbol = json_data[0].get("symbol", crypto_symbol).upper()
-                    json_data[0]["symbol"] = symbol
-                LOGGER.debug(f"Crypto data for {crypto_symbol}: {json_data}")
-                return json_data
-            else:
-                LOGGER.error(f"Failed to fetch crypto data: {response.status}")
-                return None
+        crumb = self.crumb
+        try:
+            return await self.async_get_json(
+                build_url(crumb),
+                label,
+                headers=YAHOO_HEADERS,
+                cookies=self.cookies,
+                raise_on_auth=True,
+                ttl=ttl,
+            )
+        except ATWAuthError as err:
+            LOGGER.info(f"Yahoo Finance rejected the crumb ({err}), refreshing it.")
+
+        if not await self._fetch_yahoo_crumb(stale_crumb=crumb):
+            return None
+        try:
+            return await self.async_get_json(
+                build_url(self.crumb),
+                label,
+                headers=YAHOO_HEADERS,
+                cookies=self.cookies,
+                raise_on_auth=True,
+                ttl=ttl,
+            )
+        except ATWAuthError as err:
+            LOGGER.error(f"Yahoo Finance authentication failed for {label}: {err}")
+            return None
 
     async def get_stock_historical_data(self, stock_symbol: str, interval: str):
         """Fetch historical stock data asynchronously."""
-        if not self.crumb:
-            await self._fetch_yahoo_crumb()
-
-        url = f"{YAHOO_FINANCE_HISTORICAL_URL}{stock_symbol}?interval={interval}"
-
-        async with self.session.get(
-            url, headers=YAHOO_HEADERS, cookies=self.cookies
-        ) as response:
-            if response.status == 429:
-                retry_after = int(
-                    response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
-                )
-                LOGGER.warning(
-                    f"Rate limit hit for {stock_symbol}. Retrying after {retry_after} seconds."
-                )
-                await asyncio.sleep(retry_after)
-                return None
-            if response.status == 200:
-                json_data = await response.json()
-                LOGGER.debug(f"Historical data for {stock_symbol}: {json_data}")
-                return json_data
-            else:
-                LOGGER.error(
-                    f"Failed to fetch stock historical data: {response.status}"
-                )
-                return None
+        if not self.provider.supports_historical:
+            LOGGER.warning(f"{self.api_provider} does not provide historical data.")
+            return None
+        return await self.provider.async_fetch_historical(
+            self, "stock", stock_symbol, interval
+        )
 
     async def get_crypto_historical_data(self, crypto_symbol: str, interval: str):
         """Fetch historical crypto data asynchronously."""
-        crypto_symbol_lower = crypto_symbol.lower()
-        url = f"{COINGECKO_BASE_URL}/coins/{crypto_symbol_lower}/market_chart?vs_currency=usd&days={interval}"
-        LOGGER.debug(f"Requesting crypto historical data from {url}")
-        async with self.session.get(url) as response:
-            if response.status == 429:
-                retry_after = int(
-                    response.headers.get("Retry-After", DEFAULT_RETRY_AFTER)
-                )
-                LOGGER.warning(
-                    f"Rate limit hit for {crypto_symbol}. Retrying after {retry_after} seconds."
-                )
-                await asyncio.sleep(retry_after)
-                return None
-            if response.status == 200:
-                json_data = await response.json()
-                LOGGER.debug(f"Crypto historical data for {crypto_symbol}: {json_data}")
-                return json_data
-            else:
-                LOGGER.error(
-                    f"Failed to fetch crypto historical data: {response.status}"
-                )
-                return None
+        if not self.provider.supports_historical:
+            LOGGER.warning(f"{self.api_provider} does not provide historical data.")
+            return None
+        return await self.provider.async_fetch_historical(
+            self, "crypto", crypto_symbol, interval
+        )
 
     async def close(self):
-        """Close the aiohttp session."""
-        await self.session.close()
+        """Close the aiohttp session if this client created it."""
+        if self._owns_session:
+            await self.session.close()
@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from .const import DEFAULT_CACHE_MAX_ENTRIES
+
+# Query parameters that change between sessions without changing the resource
+VOLATILE_QUERY_PARAMS = {"crumb"}
+
+
+class ATWCacheEntry:
+    """Cached response body with its validators."""
+
+    __slots__ = ("data", "expires", "etag", "last_modified")
+
+    def __init__(self, data, expires, etag=None, last_modified=None):
+        """Initialize the entry."""
+        self.data = data
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def is_fresh(self) -> bool:
+        """Return True while the entry is within its TTL."""
+        return time.monotonic() < self.expires
+
+    def conditional_headers(self) -> dict:
+        """Return the headers needed to revalidate the entry upstream."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ATWResponseCache:
+    """Bounded LRU cache of JSON responses keyed by normalized URL."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES):
+        """Initialize the cache."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Return a cache key with sorted query parameters and no session tokens."""
+        parts = urlsplit(url)
+        query = sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in VOLATILE_QUERY_PARAMS
+        )
+        return urlunsplit(
+            (
+                parts.scheme.lower(),
+                parts.netloc.lower(),
+                parts.path,
+                urlencode(query),
+                "",
+            )
+        )
+
+    def get(self, key: str) -> ATWCacheEntry | None:
+        """Return the entry for key, marking it recently used.
+
+        Expired entries are kept only while they can be revalidated; without
+        validators their body is dropped instead of staying resident.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh and not entry.conditional_headers():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, data, ttl: float, etag=None, last_modified=None):
+        """Store a response body, evicting the least recently used entries.
+
+        Expired entries without validators are purged first, so bodies that
+        are never requested again do not wait for LRU eviction.
+        """
+        for expired_key in [
+            cached_key
+            for cached_key, entry in self._entries.items()
+            if not entry.is_fresh and not entry.conditional_headers()
+        ]:
+            del self._entries[expired_key]
+            self.expirations += 1
+        self._entries[key] = ATWCacheEntry(
+            data, time.monotonic() + ttl, etag, last_modified
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(self, key: str, ttl: float):
+        """Extend an entry after the upstream confirmed it is unchanged."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.expires = time.monotonic() + ttl
+            self.revalidations += 1
+
+    def stats(self) -> dict:
+        """Return the cache counters for monitoring."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,86 @@
+import time
+from .const import (
+    LOGGER,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_RECOVERY_TIMEOUT,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class ATWCircuitBreaker:
+    """Circuit breaker that stops calling a provider after repeated failures."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_BREAKER_RECOVERY_TIMEOUT,
+    ):
+        """Initialize the breaker in the closed state."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.short_circuited = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to the provider."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self.short_circuited += 1
+                return False
+            LOGGER.debug(f"{self.name}: circuit half-open, sending probe request")
+            self.state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        # Half-open: let a single probe through
+        if self._probe_in_flight:
+            self.short_circuited += 1
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def release(self):
+        """Give back a probe slot for a request that was never sent or judged."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        if self.state != STATE_CLOSED:
+            LOGGER.info(f"{self.name}: circuit closed, provider recovered")
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failed request and open the circuit past the threshold."""
+        self.consecutive_failures += 1
+        self.total_failures += 1
+        self._probe_in_flight = False
+        if (
+            self.state == STATE_HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != STATE_OPEN:
+                LOGGER.warning(
+                    f"{self.name}: circuit opened after {self.consecutive_failures} failures"
+                )
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        """Return the breaker state for monitoring."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "short_circuited": self.short_circuited,
+        }
@@ -1,6 +1,18 @@
 from homeassistant import config_entries
+import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from .const import DOMAIN, API_PROVIDERS, DEFAULT_SCAN_INTERVAL
+from .const import (
+    DOMAIN,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_WATCH_SCAN_INTERVAL,
+    DEFAULT_API_PROVIDER,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    DEFAULT_ENTITY_MODE,
+    ENTITY_MODE_FULL,
+    ENTITY_MODE_COMPACT,
+)
+from .providers import PROVIDERS, get_provider
 
 
 class StockCryptoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -33,9 +45,9 @@ class StockCryptoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user",
             data_schema=vol.Schema(
                 {
-                    vol.Required("api_provider", default=API_PROVIDERS[0]): vol.In(
-                        API_PROVIDERS
-                    ),
+                    vol.Required(
+                        "api_provider", default=DEFAULT_API_PROVIDER
+                    ): vol.In(list(PROVIDERS)),
                     vol.Optional("preferred_currency", default="USD"): str,
                 }
             ),
@@ -187,20 +199,100 @@ class StockCryptoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 class StockCryptoOptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options flow for Advanced Trading Wallet."""
 
+    def _symbols_key(self) -> str:
+        """Return the entry data key of the symbols this entry tracks."""
+        if self.config_entry.data.get("stocks_to_track"):
+            return "stocks_to_track"
+        return "crypto_to_track"
+
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
+        symbols_key = self._symbols_key()
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            symbols = ",".join(
+                symbol.strip()
+                for symbol in user_input.get(symbols_key, "").split(",")
+                if symbol.strip()
+            )
+            if symbols_key == "crypto_to_track":
+                symbols = symbols.lower()
+            user_input[symbols_key] = symbols
+            min_interval = user_input.get(
+                "min_update_interval", DEFAULT_ADAPTIVE_MIN_INTERVAL
+            )
+            max_interval = user_input.get(
+                "max_update_interval", DEFAULT_ADAPTIVE_MAX_INTERVAL
+            )
+            if not symbols:
+                errors["base"] = "symbols_missing"
+            elif min_interval > max_interval:
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        # Sensor types the entry's provider declares for its asset type
+        provider = get_provider(
+            self.config_entry.data.get("api_provider", DEFAULT_API_PROVIDER)
+        )
+        asset_type = "stock" if symbols_key == "stocks_to_track" else "crypto"
+        sensor_types = {
+            sensor_type["key"]: sensor_type["name"]
+            for sensor_type in (provider.sensor_types(asset_type) if provider else [])
+        }
 
+        # Default to the symbols currently tracked, edited or not
+        entry_data = self.hass.data.get(DOMAIN, {}).get(
+            self.config_entry.entry_id, self.config_entry.data
+        )
         options_schema = vol.Schema(
             {
+                vol.Required(
+                    symbols_key, default=entry_data.get(symbols_key, "")
+                ): str,
                 vol.Optional(
                     "update_interval",
                     default=self.config_entry.options.get(
                         "update_interval", DEFAULT_SCAN_INTERVAL
                     ),
                 ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    "watch_interval",
+                    default=self.config_entry.options.get(
+                        "watch_interval", DEFAULT_WATCH_SCAN_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    "adaptive_interval",
+                    default=self.config_entry.options.get("adaptive_interval", False),
+                ): bool,
+                vol.Optional(
+                    "min_update_interval",
+                    default=self.config_entry.options.get(
+                        "min_update_interval", DEFAULT_ADAPTIVE_MIN_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    "max_update_interval",
+                    default=self.config_entry.options.get(
+                        "max_update_interval", DEFAULT_ADAPTIVE_MAX_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    "entity_mode",
+                    default=self.config_entry.options.get(
+                        "entity_mode", DEFAULT_ENTITY_MODE
+                    ),
+                ): vol.In([ENTITY_MODE_FULL, ENTITY_MODE_COMPACT]),
+                vol.Optional(
+                    "sensor_types",
+                    default=self.config_entry.options.get(
+                        "sensor_types", list(sensor_types)
+                    ),
+                ): cv.multi_select(sensor_types),
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=options_schema)
+        return self.async_show_form(
+            step_id="init", data_schema=options_schema, errors=errors
+        )
@@ -1,12 +1,10 @@
 import logging
+from datetime import time, timedelta
 from homeassistant.components.sensor import SensorDeviceClass
 
 # Domain name for the integration
 DOMAIN = "advanced_trading_wallet"
 
-# API Providers
-API_PROVIDERS = ["Yahoo Finance", "CoinGecko"]
-
 # API base URLs
 YAHOO_FINANCE_BASE_URL = "https://query1.finance.yahoo.com/v7/finance/quote?symbols="
 YAHOO_FINANCE_HISTORICAL_URL = "https://query1.finance.yahoo.com/v8/finance/chart/"
@@ -15,6 +13,18 @@ COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
 # Crumb and consent-related URLs for Yahoo Finance
 GET_CRUMB_URL = "https://query2.finance.yahoo.com/v1/test/getcrumb"
 
+# Storage for the Yahoo Finance crumb and cookies
+YAHOO_AUTH_STORAGE_KEY = f"{DOMAIN}_yahoo_auth"
+YAHOO_AUTH_STORAGE_VERSION = 1
+
+# Storage for the last good quotes, used to warm start sensors on boot
+QUOTE_SNAPSHOT_STORAGE_KEY = f"{DOMAIN}_quote_snapshot"
+QUOTE_SNAPSHOT_STORAGE_VERSION = 1
+QUOTE_SNAPSHOT_SAVE_DELAY = 60  # seconds
+
+# Quiet period after the last entry setup before the shared startup refresh
+STARTUP_REFRESH_DELAY = 5  # seconds
+
 # Yahoo Request headers
 YAHOO_HEADERS = {
     "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -27,6 +37,89 @@ YAHOO_HEADERS = {
 # Default retry after hitting the rate limit
 DEFAULT_RETRY_AFTER = 60  # seconds
 
+# Maximum number of symbols sent in a single Yahoo Finance quote request
+DEFAULT_YAHOO_BATCH_SIZE = 50
+
+# Maximum page size accepted by the CoinGecko markets endpoint
+COINGECKO_MAX_PER_PAGE = 250
+
+# Maximum number of in-flight requests per API provider during a refresh
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# Default request budget (refill rate in requests/second, burst size)
+DEFAULT_RATE_LIMIT = {"rate": 1.0, "capacity": 5}
+
+# Longest a request may wait for a rate limit slot before it is deferred
+DEFAULT_MAX_RATE_LIMIT_WAIT = 10  # seconds
+
+# Retries with exponential backoff and jitter for transient failures
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 1  # seconds
+DEFAULT_RETRY_BACKOFF_MAX = 30  # seconds
+
+# Market-hours-aware polling for stocks
+MARKET_OPEN_STATES = ("PRE", "REGULAR", "POST")
+MARKET_SESSION_START = time(4, 0)  # exchange local time, start of pre-market
+DEFAULT_CLOSED_MARKET_INTERVAL = timedelta(hours=1)
+
+# Symbols due within this margin are dispatched on the current tick
+SCHEDULER_TOLERANCE = timedelta(seconds=30)
+
+# Adaptive polling: shorten the interval additively while responses are
+# healthy, multiply it on rate limiting (bounds in minutes)
+DEFAULT_ADAPTIVE_MIN_INTERVAL = 1
+DEFAULT_ADAPTIVE_MAX_INTERVAL = 60
+ADAPTIVE_INTERVAL_STEP = timedelta(seconds=30)
+ADAPTIVE_BACKOFF_FACTOR = 2.0
+
+# Quote fields kept besides the sensor keys (price rule, market hours, identity)
+QUOTE_EXTRA_FIELDS_STOCK = (
+    "symbol",
+    "marketState",
+    "preMarketPrice",
+    "postMarketPrice",
+    "exchangeTimezoneName",
+    "regularMarketTime",
+)
+QUOTE_EXTRA_FIELDS_CRYPTO = ("id", "symbol", "last_updated")
+
+# Listener contexts of entities that follow aggregates rather than a symbol
+LISTENER_CONTEXT_PORTFOLIO = "__portfolio__"
+LISTENER_CONTEXT_LEDGER = "__ledger__"
+
+# Entity layouts: one entity per sensor type, or one per asset with the
+# other sensor types as attributes
+ENTITY_MODE_FULL = "full"
+ENTITY_MODE_COMPACT = "compact"
+DEFAULT_ENTITY_MODE = ENTITY_MODE_FULL
+
+# Attributes that change on every update and are not kept in the recorder
+UNRECORDED_ATTRIBUTES = frozenset({"formatted_value", "last_updated"})
+
+# Entry data keys holding the comma separated symbols to track
+SYMBOL_KEYS = ("stocks_to_track", "crypto_to_track")
+
+# Dispatcher signal (formatted with the entry ID) sent when an entry's
+# symbols change in the options flow, with the added and removed symbols
+SIGNAL_SYMBOLS_UPDATED = f"{DOMAIN}_symbols_updated_{{}}"
+
+# Seconds between price changes of the offline synthetic provider
+SYNTHETIC_TICK = 60
+
+# Request timeouts and the overall deadline for one coordinator refresh
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds
+DEFAULT_READ_TIMEOUT = 20  # seconds
+DEFAULT_REFRESH_DEADLINE = 45  # seconds
+
+# Response cache (TTL per endpoint, bounded LRU size)
+CACHE_TTL_QUOTE = 30  # seconds
+CACHE_TTL_HISTORICAL = 3600  # seconds
+DEFAULT_CACHE_MAX_ENTRIES = 512
+
+# Circuit breaker per API provider
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_BREAKER_RECOVERY_TIMEOUT = 300  # seconds
+
 # Historical data intervals
 DEFAULT_HISTORICAL_INTERVALS = ["1d", "5d", "1wk", "1mo", "1y", "5y"]
 DEFAULT_HISTORICAL_INTERVAL = "1wk"
@@ -36,6 +129,7 @@ PLATFORMS = ["sensor"]
 
 # Default values
 DEFAULT_SCAN_INTERVAL = 10
+DEFAULT_WATCH_SCAN_INTERVAL = 30
 DEFAULT_API_PROVIDER = "Yahoo Finance"
 
 # Services
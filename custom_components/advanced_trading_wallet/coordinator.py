@@ -1,9 +1,34 @@
+import asyncio
+import time
 from datetime import timedelta
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.storage import Store
-from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
 from .api import ATWAPIClient
-from .const import DOMAIN, LOGGER, DEFAULT_SCAN_INTERVAL, DEFAULT_API_PROVIDER
+from .scheduler import ATWPollScheduler
+from .adaptive_interval import ATWAdaptiveInterval
+from .symbol_index import ATWSymbolIndex
+from .portfolio import ATWPortfolioSnapshot
+from .providers import get_provider
+from .const import (
+    DOMAIN,
+    LOGGER,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_WATCH_SCAN_INTERVAL,
+    DEFAULT_API_PROVIDER,
+    DEFAULT_REFRESH_DEADLINE,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    LISTENER_CONTEXT_PORTFOLIO,
+    LISTENER_CONTEXT_LEDGER,
+    QUOTE_SNAPSHOT_STORAGE_KEY,
+    QUOTE_SNAPSHOT_STORAGE_VERSION,
+    QUOTE_SNAPSHOT_SAVE_DELAY,
+    STARTUP_REFRESH_DELAY,
+)
 from homeassistant.helpers.update_coordinator import UpdateFailed
 
 
@@ -53,16 +78,45 @@ class ATWCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         preferred_currency="usd",
         update_interval=DEFAULT_SCAN_INTERVAL,
+        refresh_deadline=DEFAULT_REFRESH_DEADLINE,
     ):
         """Initialize the coordinator."""
         self.hass = hass
         self.preferred_currency = preferred_currency.upper()
-        self.stocks = {}
-        self.crypto = {}
         self.transactions = {"stocks": {}, "crypto": {}}
         self.historical_data = {}
         self.data_store = ATWDataStore(hass)
+        self._snapshot_store = Store(
+            hass, QUOTE_SNAPSHOT_STORAGE_VERSION, QUOTE_SNAPSHOT_STORAGE_KEY
+        )
         self.api_clients = {}
+        self.refresh_deadline = refresh_deadline
+        self.stale_symbols = set()
+        self.sensor_values = {}
+        self.changed_symbols = set()
+        self.state_writes = {"written": 0, "skipped": 0}
+        # Provider -> entry owning its diagnostic status sensor, and entry ->
+        # (provider, callback adding the sensor) for handing it over on unload
+        self.provider_status_sensors = {}
+        self.provider_status_adders = {}
+        self._state_writes_since = dt_util.utcnow()
+        self._context_listeners = {}
+        self._notified_update_success = None
+        self.poll_scheduler = ATWPollScheduler()
+        self.entry_intervals = {}
+        self.adaptive_intervals = {}
+        self.symbol_index = ATWSymbolIndex()
+        self.startup_stats = {}
+        self._startup_refresh_requests = 0
+        self._unsub_startup_refresh = None
+        self._portfolio = None
+        self._portfolio_changed = True
+        self._ledger_changed = True
+        self.portfolio_scans = 0
+        self._portfolio_scans_at_refresh = 0
+        self.refresh_stats = {}
+        # One session on Home Assistant's shared connector for all providers
+        self.session = async_create_clientsession(hass)
         LOGGER.debug(
             f"Initializing coordinator with update_interval={update_interval} minutes"
         )
@@ -73,108 +127,446 @@ class ATWCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(minutes=update_interval),
         )
 
-    async def async_set_update_interval(self, new_interval: timedelta):
-        """Set a new update interval and reschedule updates."""
-        LOGGER.debug(f"Setting new update interval: {new_interval}")
-        self.update_interval = new_interval
-        # Reschedule the update
-        if self._unsub_refresh:
-            self._unsub_refresh()
-        self._schedule_refresh()
+    @property
+    def stocks(self) -> dict:
+        """Return the tracked stock symbols mapped to their API provider."""
+        return self.symbol_index.stocks
+
+    @property
+    def crypto(self) -> dict:
+        """Return the tracked crypto symbols mapped to their API provider."""
+        return self.symbol_index.crypto
+
+    @callback
+    def async_add_listener(self, update_callback, context=None):
+        """Listen for updates of a symbol, an aggregate context, or all (None)."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        listeners = self._context_listeners.setdefault(context, {})
+        listeners[remove_listener] = update_callback
+
+        @callback
+        def remove_context_listener() -> None:
+            """Remove the listener from the context index and the coordinator."""
+            listeners.pop(remove_listener, None)
+            if not listeners:
+                self._context_listeners.pop(context, None)
+            remove_listener()
+
+        return remove_context_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose symbols or aggregates changed.
+
+        Every listener is notified when the refresh success state flips, so
+        all entities pick up their availability.
+        """
+        if self.last_update_success != self._notified_update_success:
+            self._notified_update_success = self.last_update_success
+            contexts = list(self._context_listeners)
+        else:
+            contexts = [None, *self.changed_symbols]
+            if self._portfolio_changed:
+                contexts.append(LISTENER_CONTEXT_PORTFOLIO)
+            if self._ledger_changed:
+                contexts.append(LISTENER_CONTEXT_LEDGER)
+        self._portfolio_changed = False
+        self._ledger_changed = False
+        for context in contexts:
+            listeners = self._context_listeners.get(context, {})
+            for update_callback in list(listeners.values()):
+                update_callback()
 
     async def async_close(self):
         """Close any open sessions or resources."""
+        if self._unsub_startup_refresh:
+            self._unsub_startup_refresh()
+            self._unsub_startup_refresh = None
         for client in self.api_clients.values():
             await client.close()
         self.api_clients.clear()
+        await self.session.close()
+
+    def set_entry_intervals(
+        self,
+        entry_id: str,
+        update_interval=DEFAULT_SCAN_INTERVAL,
+        watch_interval=DEFAULT_WATCH_SCAN_INTERVAL,
+        adaptive=False,
+        min_interval=DEFAULT_ADAPTIVE_MIN_INTERVAL,
+        max_interval=DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    ):
+        """Set the refresh tiers (in minutes) of an entry's held and watched symbols."""
+        self.entry_intervals[entry_id] = (
+            timedelta(minutes=update_interval),
+            timedelta(minutes=watch_interval),
+        )
+        if adaptive:
+            self.adaptive_intervals[entry_id] = ATWAdaptiveInterval(
+                entry_id,
+                timedelta(minutes=update_interval),
+                timedelta(minutes=min_interval),
+                timedelta(minutes=max_interval),
+            )
+        else:
+            self.adaptive_intervals.pop(entry_id, None)
+
+    def remove_entry_intervals(self, entry_id: str):
+        """Forget the refresh tiers of an unloaded entry."""
+        self.entry_intervals.pop(entry_id, None)
+        self.adaptive_intervals.pop(entry_id, None)
+
+    def get_entry_interval(self, entry_id: str) -> timedelta:
+        """Return the effective refresh interval of an entry's held symbols."""
+        if entry_id in self.adaptive_intervals:
+            return self.adaptive_intervals[entry_id].interval
+        if entry_id in self.entry_intervals:
+            return self.entry_intervals[entry_id][0]
+        return self.update_interval
+
+    async def async_force_refresh(self, symbols=None):
+        """Request a refresh that fetches the given symbols, or all, even if not due."""
+        self.poll_scheduler.mark_due(dt_util.utcnow(), symbols)
+        await self.async_request_refresh()
+
+    def register_entry(self, entry_id: str, entry_data: dict):
+        """Add or replace the symbols of one entry without re-indexing the others."""
+        self.symbol_index.add_entry(entry_id, entry_data)
+        self._invalidate_portfolio(ledger=True)
+        self._update_intervals()
+
+    def unregister_entry(self, entry_id: str):
+        """Remove the symbols and refresh tiers of an unloaded entry."""
+        self.symbol_index.remove_entry(entry_id)
+        self.remove_entry_intervals(entry_id)
+        self._invalidate_portfolio(ledger=True)
+        self._update_intervals()
+
+    @callback
+    def async_schedule_startup_refresh(self):
+        """Schedule one refresh shortly after the last entry registers its symbols.
+
+        Every call pushes the refresh back, so entries loading together at
+        startup share a single refresh of the symbols that have no data yet.
+        """
+        self._startup_refresh_requests += 1
+        if self._unsub_startup_refresh:
+            self._unsub_startup_refresh()
+        self._unsub_startup_refresh = async_call_later(
+            self.hass, STARTUP_REFRESH_DELAY, self._async_startup_refresh
+        )
+
+    async def _async_startup_refresh(self, _now):
+        """Run the coalesced refresh and record its request counts."""
+        self._unsub_startup_refresh = None
+        requests_sent = self._total_requests_sent()
+        await self.async_refresh()
+        stats = {
+            "entries": len(self.symbol_index.entries),
+            "coalesced_refresh_requests": self._startup_refresh_requests,
+            "fetched_symbols": self.refresh_stats.get("fetched_symbols", 0),
+            "requests_sent": self._total_requests_sent() - requests_sent,
+        }
+        self._startup_refresh_requests = 0
+        if not self.startup_stats:
+            self.startup_stats = stats
+            LOGGER.info(f"Startup refresh completed: {stats}")
+
+    def _update_intervals(self):
+        """Recompute the refresh tier of every tracked symbol."""
+        intervals = {}
+        for entry_id, entry_data in self.symbol_index.entries.items():
+            held_interval = self.get_entry_interval(entry_id)
+            _, watch_interval = self.entry_intervals.get(
+                entry_id, (held_interval, held_interval)
+            )
+            # Watch-only symbols never refresh faster than held ones
+            watch_interval = max(watch_interval, held_interval)
+            # Held positions refresh on the fast tier, watch-only symbols slowly
+            for asset_type, amount_key in (
+                ("stock", "stock_amount_owned"),
+                ("crypto", "crypto_amount_owned"),
+            ):
+                interval = (
+                    held_interval if entry_data.get(amount_key, 0) else watch_interval
+                )
+                for symbol in self.symbol_index.entry_symbols(asset_type, entry_id):
+                    intervals[symbol] = min(interval, intervals.get(symbol, interval))
+        # Symbols with live data wait for their tier; stale ones, such as
+        # those restored from the snapshot, are fetched on the next refresh
+        deferred = (self.data or {}).keys() - self.stale_symbols
+        self.poll_scheduler.set_intervals(intervals, dt_util.utcnow(), deferred)
+        self._update_tick()
+
+    def _update_tick(self):
+        """Run the coordinator at the interval of the fastest refresh tier."""
+        tick = self.poll_scheduler.min_interval()
+        if tick is None or tick == self.update_interval:
+            return
+        LOGGER.debug(f"Setting coordinator tick to {tick}")
+        self.update_interval = tick
+        if self._unsub_refresh:
+            self._schedule_refresh()
 
-    def update_symbols(self, data):
-        """Update the list of symbols and their API providers based on current entries."""
-        stocks = {}
-        crypto = {}
-        for entry_id, entry_data in data.items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
+    async def async_restore_snapshot(self):
+        """Populate data from the last saved quotes, marked stale until refreshed."""
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot:
+            return
+        data = {}
+        sensor_values = {}
+        for symbol, item in snapshot.items():
+            asset_type = item.get("asset_type")
+            provider = get_provider(item.get("api_provider"))
+            if provider is None or not provider.supports(asset_type):
                 continue
-            api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
-            for stock_symbol in entry_data.get("stocks_to_track", "").split(","):
-                stock_symbol = stock_symbol.strip()
-                if stock_symbol:
-                    stocks[stock_symbol] = api_provider
-            for crypto_symbol in entry_data.get("crypto_to_track", "").split(","):
-                crypto_symbol = crypto_symbol.strip()
-                if crypto_symbol:
-                    crypto[crypto_symbol] = api_provider
-        self.stocks = stocks
-        self.crypto = crypto
-        LOGGER.debug(
-            f"Updated symbols to track: Stocks={self.stocks}, Crypto={self.crypto}"
+            quote = provider.parse_quote(asset_type, item.get("quote", {}))
+            data[symbol] = quote
+            sensor_values[symbol] = provider.extract(asset_type, quote)
+        self.data = data
+        self.sensor_values = sensor_values
+        self.stale_symbols = set(data)
+        self.changed_symbols = set(data)
+        LOGGER.info(f"Restored {len(data)} quotes from the last snapshot")
+
+    @callback
+    def _snapshot_data(self) -> dict:
+        """Return the current quotes in their persisted form."""
+        snapshot = {}
+        for asset_type, symbols in (("stock", self.stocks), ("crypto", self.crypto)):
+            for symbol, api_provider in symbols.items():
+                quote = (self.data or {}).get(symbol)
+                if quote is not None:
+                    snapshot[symbol] = {
+                        "asset_type": asset_type,
+                        "api_provider": api_provider,
+                        "quote": quote.as_dict(),
+                    }
+        return snapshot
+
+    def _get_api_client(self, api_provider: str) -> ATWAPIClient:
+        """Return the API client for a provider, creating it if needed."""
+        if api_provider not in self.api_clients:
+            self.api_clients[api_provider] = ATWAPIClient(
+                self.hass, api_provider, session=self.session
+            )
+        return self.api_clients[api_provider]
+
+    def get_api_stats(self) -> dict:
+        """Return request statistics for each API provider."""
+        return {
+            api_provider: {
+                "rate_limiter": api_client.rate_limiter.stats(),
+                "circuit_breaker": api_client.circuit_breaker.stats(),
+                "response_cache": api_client.response_cache.stats(),
+                "coalesced_requests": api_client.coalesced_requests,
+                "requests_sent": api_client.requests_sent,
+            }
+            for api_provider, api_client in self.api_clients.items()
+        }
+
+    def get_refresh_stats(self) -> dict:
+        """Return instrumentation for the last coordinator refresh."""
+        return {
+            **self.refresh_stats,
+            **self.poll_scheduler.stats(),
+            "state_writes": dict(self.state_writes),
+            "state_writes_per_day": self._state_writes_per_day(),
+            "startup": self.startup_stats,
+            "portfolio_scans": self.portfolio_scans - self._portfolio_scans_at_refresh,
+            "adaptive_intervals": {
+                entry_id: controller.stats()
+                for entry_id, controller in self.adaptive_intervals.items()
+            },
+        }
+
+    def _state_writes_per_day(self) -> int:
+        """Return the state write rate, each write being one recorder row."""
+        elapsed = (dt_util.utcnow() - self._state_writes_since).total_seconds()
+        if elapsed <= 0:
+            return 0
+        return round(self.state_writes["written"] * 86400 / elapsed)
+
+    def _total_requests_sent(self) -> int:
+        """Return the number of HTTP requests sent to all providers."""
+        return sum(api_client.requests_sent for api_client in self.api_clients.values())
+
+    def _total_rate_limit_wait(self) -> float:
+        """Return the seconds all providers have spent waiting for rate limit slots."""
+        return sum(
+            api_client.rate_limiter.total_wait
+            for api_client in self.api_clients.values()
         )
 
+    def _throttle_events(self, api_provider: str) -> int:
+        """Return how often a provider has rate limited or deferred requests."""
+        api_client = self.api_clients.get(api_provider)
+        if api_client is None:
+            return 0
+        rate_limiter = api_client.rate_limiter
+        return rate_limiter.rate_limited_responses + rate_limiter.deferred_requests
+
+    def _adapt_intervals(self, outcomes: dict):
+        """Feed each provider's refresh outcome to the adaptive entries using it."""
+        changed = False
+        for entry_id, controller in self.adaptive_intervals.items():
+            entry_data = self.symbol_index.entries.get(entry_id, {})
+            api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
+            outcome = outcomes.get(api_provider)
+            if outcome == "throttled":
+                retry_after = self.api_clients[api_provider].rate_limiter.wait_time()
+                changed |= controller.record_throttled(retry_after)
+            elif outcome == "healthy":
+                changed |= controller.record_healthy()
+        if changed:
+            self._update_intervals()
+
+    async def _async_fetch_group(
+        self, asset_type: str, api_provider: str, symbols: list[str], results: dict
+    ):
+        """Fetch all symbols of one asset type from one provider into results."""
+        api_client = self._get_api_client(api_provider)
+        try:
+            if asset_type == "stock":
+                await api_client.get_stocks_data(symbols, results=results)
+            else:
+                await api_client.get_cryptos_data(symbols, results=results)
+        except Exception as e:
+            LOGGER.error(
+                f"Error fetching data for {asset_type} {', '.join(symbols)}: {e}"
+            )
+
     async def _async_update_data(self):
         """Fetch data for all symbols."""
         data = {}
+        started = time.monotonic()
+        requests_sent = self._total_requests_sent()
+        self._portfolio_scans_at_refresh = self.portfolio_scans
+        rate_limit_wait = self._total_rate_limit_wait()
         try:
-            # Fetch data for stocks grouped by API provider
-            stocks_by_provider = {}
-            for symbol, api_provider in self.stocks.items():
-                stocks_by_provider.setdefault(api_provider, []).append(symbol)
-
-            for api_provider, symbols in stocks_by_provider.items():
-                if api_provider not in self.api_clients:
-                    self.api_clients[api_provider] = ATWAPIClient(
-                        self.hass, api_provider
-                    )
-                api_client = self.api_clients[api_provider]
-                for symbol in symbols:
-                    try:
-                        stock_data = await api_client.get_stock_data(symbol)
-                        if stock_data:
-                            data[symbol] = stock_data
-                        else:
-                            LOGGER.warning(f"No data received for stock: {symbol}")
-                            # Retain previous data if available
-                            if self.data and symbol in self.data:
-                                data[symbol] = self.data[symbol]
-                    except Exception as e:
-                        LOGGER.error(f"Error fetching data for stock {symbol}: {e}")
-                        # Retain previous data if available
-                        if self.data and symbol in self.data:
-                            data[symbol] = self.data[symbol]
-
-            # Fetch data for cryptocurrencies grouped by API provider
-            crypto_by_provider = {}
-            for symbol, api_provider in self.crypto.items():
-                crypto_by_provider.setdefault(api_provider, []).append(symbol)
-
-            for api_provider, symbols in crypto_by_provider.items():
-                if api_provider not in self.api_clients:
-                    self.api_clients[api_provider] = ATWAPIClient(
-                        self.hass, api_provider
+            # Group symbols by asset type and API provider, skipping stocks
+            # whose market is closed until they are due again
+            now = dt_util.utcnow()
+            due_symbols = self.poll_scheduler.pop_due(now)
+            groups = {}
+            skipped_symbols = []
+            tracked = (("stock", self.stocks), ("crypto", self.crypto))
+            for asset_type, symbols in tracked:
+                for symbol, api_provider in symbols.items():
+                    if symbol not in due_symbols:
+                        skipped_symbols.append(symbol)
+                        continue
+                    groups.setdefault((asset_type, api_provider), []).append(symbol)
+
+            # Fetch every provider group concurrently, within the refresh deadline
+            results = {group: {} for group in groups}
+            throttle_events = {
+                api_provider: self._throttle_events(api_provider)
+                for _, api_provider in groups
+            }
+            tasks = [
+                asyncio.create_task(
+                    self._async_fetch_group(*group, symbols, results[group])
+                )
+                for group, symbols in groups.items()
+            ]
+            deadline_exceeded = False
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=self.refresh_deadline)
+                if pending:
+                    deadline_exceeded = True
+                    LOGGER.warning(
+                        f"Refresh deadline of {self.refresh_deadline} seconds exceeded, "
+                        "keeping previous values for the remaining symbols."
                     )
-                api_client = self.api_clients[api_provider]
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+            stale_symbols = set()
+            fetched_symbols = 0
+            outcomes = {}
+            sensor_values = {}
+            for (asset_type, api_provider), symbols in groups.items():
+                group_data = results[(asset_type, api_provider)]
+                provider = get_provider(api_provider)
                 for symbol in symbols:
-                    try:
-                        crypto_data = await api_client.get_crypto_data(symbol)
-                        if crypto_data:
-                            data[symbol] = crypto_data
-                        else:
-                            LOGGER.warning(f"No data received for crypto: {symbol}")
-                            # Retain previous data if available
-                            if self.data and symbol in self.data:
-                                data[symbol] = self.data[symbol]
-                    except Exception as e:
-                        LOGGER.error(f"Error fetching data for crypto {symbol}: {e}")
+                    symbol_data = group_data.get(symbol)
+                    if symbol_data:
+                        data[symbol] = symbol_data
+                        # One pass produces every sensor value of the symbol
+                        sensor_values[symbol] = provider.extract(
+                            asset_type, symbol_data
+                        )
+                        fetched_symbols += 1
+                        quote = symbol_data if asset_type == "stock" else None
+                        self.poll_scheduler.reschedule(symbol, now, quote)
+                    else:
+                        self.poll_scheduler.retry(symbol, now)
+                        LOGGER.warning(f"No data received for {asset_type}: {symbol}")
+                        stale_symbols.add(symbol)
                         # Retain previous data if available
                         if self.data and symbol in self.data:
                             data[symbol] = self.data[symbol]
+                            sensor_values[symbol] = self.sensor_values.get(symbol)
+                # A provider is healthy when every one of its groups was complete
+                complete = not deadline_exceeded and all(
+                    group_data.get(symbol) for symbol in symbols
+                )
+                if self._throttle_events(api_provider) > throttle_events[api_provider]:
+                    outcomes[api_provider] = "throttled"
+                elif not complete:
+                    outcomes[api_provider] = "degraded"
+                else:
+                    outcomes.setdefault(api_provider, "healthy")
+            self._adapt_intervals(outcomes)
+
+            # Symbols that are not due keep their last quote, and whether it is
+            # stale, without a request
+            for symbol in skipped_symbols:
+                if self.data and symbol in self.data:
+                    data[symbol] = self.data[symbol]
+                    sensor_values[symbol] = self.sensor_values.get(symbol)
+            stale_symbols |= self.stale_symbols & set(skipped_symbols)
+
+            # Symbols whose sensor values or staleness differ from the previous refresh
+            changed_symbols = {
+                symbol
+                for symbol, values in sensor_values.items()
+                if values != self.sensor_values.get(symbol)
+            }
+            changed_symbols |= stale_symbols ^ self.stale_symbols
+
+            self.stale_symbols = stale_symbols
+            self.refresh_stats = {
+                "duration": round(time.monotonic() - started, 3),
+                "deadline": self.refresh_deadline,
+                "deadline_exceeded": deadline_exceeded,
+                "fetched_symbols": fetched_symbols,
+                "skipped_symbols": len(skipped_symbols),
+                "stale_symbols": len(stale_symbols),
+                "changed_symbols": len(changed_symbols),
+                "requests_sent": self._total_requests_sent() - requests_sent,
+                "rate_limit_wait": round(
+                    self._total_rate_limit_wait() - rate_limit_wait, 3
+                ),
+            }
 
             if not data:
                 # If new data is empty, retain the previous data
                 LOGGER.warning("No new data fetched, retaining previous data.")
+                self.changed_symbols = set()
                 return self.data or {}
             else:
                 # Update the stored data
                 self.data = data
+                self.sensor_values = sensor_values
+                self.changed_symbols = changed_symbols
+                if changed_symbols:
+                    self._invalidate_portfolio()
+                    self._snapshot_store.async_delay_save(
+                        self._snapshot_data, QUOTE_SNAPSHOT_SAVE_DELAY
+                    )
                 return data
         except Exception as e:
             LOGGER.error(f"Error in _async_update_data: {e}")
@@ -197,9 +589,7 @@ class ATWCoordinator(DataUpdateCoordinator):
             LOGGER.error(f"Invalid asset type: {asset_type}")
             return
 
-        if api_provider not in self.api_clients:
-            self.api_clients[api_provider] = ATWAPIClient(self.hass, api_provider)
-        api_client = self.api_clients[api_provider]
+        api_client = self._get_api_client(api_provider)
 
         try:
             if asset_type == "stock":
@@ -225,159 +615,135 @@ class ATWCoordinator(DataUpdateCoordinator):
 
     async def buy_stock(self, stock_symbol: str, amount: float, purchase_price: float):
         """Log a stock purchase and update per-entry data."""
-        # Loop through entries to find the one that contains the stock
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            stocks_to_track = [
-                s.strip() for s in entry_data.get("stocks_to_track", "").split(",")
-            ]
-            if stock_symbol in stocks_to_track:
-                # Update the entry data
-                old_amount = entry_data.get("stock_amount_owned", 0)
-                old_purchase_price = entry_data.get("stock_purchase_price", 0)
-
-                # Calculate new amount and purchase price
-                total_amount = old_amount + amount
-                total_value = (old_amount * old_purchase_price) + (
-                    amount * purchase_price
-                )
-                new_purchase_price = total_value / total_amount if total_amount else 0
+        entry_id, entry_data = self.symbol_index.find_entry("stock", stock_symbol)
+        if entry_data is None:
+            LOGGER.warning(f"Stock symbol {stock_symbol} not found in any entry.")
+            return
 
-                entry_data["stock_amount_owned"] = total_amount
-                entry_data["stock_purchase_price"] = new_purchase_price
+        # Update the entry data
+        old_amount = entry_data.get("stock_amount_owned", 0)
+        old_purchase_price = entry_data.get("stock_purchase_price", 0)
 
-                # Update the data store
-                self.data_store.set_entry_data(entry_id, entry_data)
-                await self.data_store.async_save()
+        # Calculate new amount and purchase price
+        total_amount = old_amount + amount
+        total_value = (old_amount * old_purchase_price) + (amount * purchase_price)
+        new_purchase_price = total_value / total_amount if total_amount else 0
 
-                LOGGER.debug(
-                    f"Updated entry {entry_id} for stock {stock_symbol}: amount={total_amount}, purchase_price={new_purchase_price}"
-                )
-                break
-        else:
-            LOGGER.warning(f"Stock symbol {stock_symbol} not found in any entry.")
+        entry_data["stock_amount_owned"] = total_amount
+        entry_data["stock_purchase_price"] = new_purchase_price
+
+        # Update the data store
+        self.data_store.set_entry_data(entry_id, entry_data)
+        await self.data_store.async_save()
+
+        # The position may have moved between refresh tiers
+        self._invalidate_portfolio(ledger=True)
+        self._update_intervals()
+
+        LOGGER.debug(
+            f"Updated entry {entry_id} for stock {stock_symbol}: amount={total_amount}, purchase_price={new_purchase_price}"
+        )
 
     async def sell_stock(self, stock_symbol: str, amount: float):
         """Log a stock sale and update per-entry data."""
-        # Loop through entries to find the one that contains the stock
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            stocks_to_track = [
-                s.strip() for s in entry_data.get("stocks_to_track", "").split(",")
-            ]
-            if stock_symbol in stocks_to_track:
-                # Get current amount owned
-                current_amount = entry_data.get("stock_amount_owned", 0)
-                if amount > current_amount:
-                    raise ValueError(
-                        f"Cannot sell {amount} shares; only {current_amount} available."
-                    )
-                # Update the entry data
-                new_amount = current_amount - amount
-                entry_data["stock_amount_owned"] = new_amount
+        entry_id, entry_data = self.symbol_index.find_entry("stock", stock_symbol)
+        if entry_data is None:
+            LOGGER.warning(f"Stock symbol {stock_symbol} not found in any entry.")
+            return
 
-                # Update the data store
-                self.data_store.set_entry_data(entry_id, entry_data)
-                await self.data_store.async_save()
+        # Get current amount owned
+        current_amount = entry_data.get("stock_amount_owned", 0)
+        if amount > current_amount:
+            raise ValueError(
+                f"Cannot sell {amount} shares; only {current_amount} available."
+            )
+        # Update the entry data
+        new_amount = current_amount - amount
+        entry_data["stock_amount_owned"] = new_amount
 
-                LOGGER.debug(
-                    f"Updated entry {entry_id} for stock {stock_symbol}: amount={new_amount}"
-                )
-                break
-        else:
-            LOGGER.warning(f"Stock symbol {stock_symbol} not found in any entry.")
+        # Update the data store
+        self.data_store.set_entry_data(entry_id, entry_data)
+        await self.data_store.async_save()
+
+        # The position may have moved between refresh tiers
+        self._invalidate_portfolio(ledger=True)
+        self._update_intervals()
+
+        LOGGER.debug(
+            f"Updated entry {entry_id} for stock {stock_symbol}: amount={new_amount}"
+        )
 
     async def buy_crypto(
         self, crypto_symbol: str, amount: float, purchase_price: float
     ):
         """Log a cryptocurrency purchase and update per-entry data."""
-        # Loop through entries to find the one that contains the crypto
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            crypto_to_track = [
-                s.strip() for s in entry_data.get("crypto_to_track", "").split(",")
-            ]
-            if crypto_symbol in crypto_to_track:
-                # Update the entry data
-                old_amount = entry_data.get("crypto_amount_owned", 0)
-                old_purchase_price = entry_data.get("crypto_purchase_price", 0)
-
-                # Calculate new amount and purchase price
-                total_amount = old_amount + amount
-                total_value = (old_amount * old_purchase_price) + (
-                    amount * purchase_price
-                )
-                new_purchase_price = total_value / total_amount if total_amount else 0
+        entry_id, entry_data = self.symbol_index.find_entry("crypto", crypto_symbol)
+        if entry_data is None:
+            LOGGER.warning(
+                f"Cryptocurrency symbol {crypto_symbol} not found in any entry."
+            )
+            return
 
-                entry_data["crypto_amount_owned"] = total_amount
-                entry_data["crypto_purchase_price"] = new_purchase_price
+        # Update the entry data
+        old_amount = entry_data.get("crypto_amount_owned", 0)
+        old_purchase_price = entry_data.get("crypto_purchase_price", 0)
 
-                # Update the data store
-                self.data_store.set_entry_data(entry_id, entry_data)
-                await self.data_store.async_save()
+        # Calculate new amount and purchase price
+        total_amount = old_amount + amount
+        total_value = (old_amount * old_purchase_price) + (amount * purchase_price)
+        new_purchase_price = total_value / total_amount if total_amount else 0
 
-                LOGGER.debug(
-                    f"Updated entry {entry_id} for crypto {crypto_symbol}: amount={total_amount}, purchase_price={new_purchase_price}"
-                )
-                break
-        else:
+        entry_data["crypto_amount_owned"] = total_amount
+        entry_data["crypto_purchase_price"] = new_purchase_price
+
+        # Update the data store
+        self.data_store.set_entry_data(entry_id, entry_data)
+        await self.data_store.async_save()
+
+        # The position may have moved between refresh tiers
+        self._invalidate_portfolio(ledger=True)
+        self._update_intervals()
+
+        LOGGER.debug(
+            f"Updated entry {entry_id} for crypto {crypto_symbol}: amount={total_amount}, purchase_price={new_purchase_price}"
+        )
+
+    async def sell_crypto(self, crypto_symbol: str, amount: float):
+        """Log a cryptocurrency sale and update per-entry data."""
+        entry_id, entry_data = self.symbol_index.find_entry("crypto", crypto_symbol)
+        if entry_data is None:
             LOGGER.warning(
                 f"Cryptocurrency symbol {crypto_symbol} not found in any entry."
             )
+            return
 
-    async def sell_crypto(self, crypto_symbol: str, amount: float):
-        """Log a cryptocurrency sale and update per-entry data."""
-        # Loop through entries to find the one that contains the crypto
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            crypto_to_track = [
-                s.strip() for s in entry_data.get("crypto_to_track", "").split(",")
-            ]
-            if crypto_symbol in crypto_to_track:
-                # Get current amount owned
-                current_amount = entry_data.get("crypto_amount_owned", 0)
-                if amount > current_amount:
-                    raise ValueError(
-                        f"Cannot sell {amount} units; only {current_amount} available."
-                    )
-                # Update the entry data
-                new_amount = current_amount - amount
-                entry_data["crypto_amount_owned"] = new_amount
+        # Get current amount owned
+        current_amount = entry_data.get("crypto_amount_owned", 0)
+        if amount > current_amount:
+            raise ValueError(
+                f"Cannot sell {amount} units; only {current_amount} available."
+            )
+        # Update the entry data
+        new_amount = current_amount - amount
+        entry_data["crypto_amount_owned"] = new_amount
 
-                # Update the data store
-                self.data_store.set_entry_data(entry_id, entry_data)
-                await self.data_store.async_save()
+        # Update the data store
+        self.data_store.set_entry_data(entry_id, entry_data)
+        await self.data_store.async_save()
 
-                LOGGER.debug(
-                    f"Updated entry {entry_id} for crypto {crypto_symbol}: amount={new_amount}"
-                )
-                break
-            else:
-                LOGGER.warning(
-                    f"Cryptocurrency symbol {crypto_symbol} not found in any entry."
-                )
+        # The position may have moved between refresh tiers
+        self._invalidate_portfolio(ledger=True)
+        self._update_intervals()
+
+        LOGGER.debug(
+            f"Updated entry {entry_id} for crypto {crypto_symbol}: amount={new_amount}"
+        )
 
     def calculate_total_investment(self):
         """Calculate the total amount invested in stocks and crypto."""
         total_investment = 0
         # Iterate over all entries
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
+        for entry_data in self.symbol_index.entries.values():
             # Sum the total investment for stocks
             stock_amount_owned = entry_data.get("stock_amount_owned", 0)
             stock_purchase_price = entry_data.get("stock_purchase_price", 0)
@@ -390,66 +756,62 @@ class ATWCoordinator(DataUpdateCoordinator):
 
         return total_investment
 
-    def calculate_total_value(self):
-        """Calculate the total current value of stocks and crypto."""
+    def get_price(self, symbol: str):
+        """Return a symbol's price as its price sensor shows it.
+
+        The first sensor type of both asset types is the price, extracted with
+        the pre/post market rule for stocks, so the portfolio values positions
+        at the same price without walking the quote again.
+        """
+        values = self.sensor_values.get(symbol)
+        return values[0] if values else None
+
+    def calculate_stocks_value(self):
+        """Calculate the total current value of stocks."""
         total_value = 0
-        # Iterate over all entries
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            # Calculate stock values
-            stock_amount_owned = entry_data.get("stock_amount_owned", 0)
-            for stock_symbol in entry_data.get("stocks_to_track", "").split(","):
-                stock_symbol = stock_symbol.strip()
-                if not stock_symbol:
-                    continue
-
-                # Fetch stock price from coordinator data
-                stock_data = self.data.get(stock_symbol)
-                if stock_data and "quoteResponse" in stock_data:
-                    stock_info = stock_data["quoteResponse"]["result"][0]
-                    stock_price = stock_info.get("regularMarketPrice")
-                    if stock_price is None:
-                        # Handle pre/post market prices
-                        market_state = stock_info.get("marketState")
-                        if market_state in ["PRE", "PREPRE"]:
-                            stock_price = stock_info.get("preMarketPrice")
-                        elif market_state in ["POST", "POSTPOST"]:
-                            stock_price = stock_info.get("postMarketPrice")
-                    if stock_price is not None:
-                        total_value += stock_price * stock_amount_owned
-
-            # Calculate crypto values
-            crypto_amount_owned = entry_data.get("crypto_amount_owned", 0)
-            for crypto_symbol in entry_data.get("crypto_to_track", "").split(","):
-                crypto_symbol = crypto_symbol.strip()
-                if not crypto_symbol:
-                    continue
-
-                # Fetch crypto price from coordinator data
-                crypto_data = self.data.get(crypto_symbol)
-                if crypto_data:
-                    crypto_info = (
-                        crypto_data[0] if isinstance(crypto_data, list) else crypto_data
-                    )
-                    crypto_price = crypto_info.get("current_price")
-                    if crypto_price is not None:
-                        total_value += crypto_price * crypto_amount_owned
+        for stock_symbol, entry_data in self.symbol_index.positions("stock"):
+            stock_price = self.get_price(stock_symbol)
+            if stock_price is not None:
+                total_value += stock_price * entry_data.get("stock_amount_owned", 0)
+        return total_value
 
+    def calculate_crypto_value(self):
+        """Calculate the total current value of crypto."""
+        total_value = 0
+        for crypto_symbol, entry_data in self.symbol_index.positions("crypto"):
+            crypto_price = self.get_price(crypto_symbol)
+            if crypto_price is not None:
+                total_value += crypto_price * entry_data.get("crypto_amount_owned", 0)
         return total_value
 
+    def _invalidate_portfolio(self, ledger: bool = False):
+        """Drop the portfolio snapshot after a price or ledger change."""
+        self._portfolio = None
+        self._portfolio_changed = True
+        if ledger:
+            self._ledger_changed = True
+
+    @property
+    def portfolio(self) -> ATWPortfolioSnapshot:
+        """Return the portfolio aggregates, scanning positions once per generation.
+
+        The snapshot is invalidated when a refresh changes any quote and when
+        entries or positions change; every portfolio sensor reads the same one.
+        """
+        if self._portfolio is None:
+            self.portfolio_scans += 1
+            self._portfolio = ATWPortfolioSnapshot(
+                self.portfolio_scans,
+                self.calculate_stocks_value(),
+                self.calculate_crypto_value(),
+                self.calculate_total_investment(),
+            )
+        return self._portfolio
+
     def calculate_percentage_change(self):
         """Calculate the percentage change of the portfolio."""
-        total_investment = self.calculate_total_investment()
-        total_value = self.calculate_total_value()
-        if total_investment == 0:
-            return 0
-        return ((total_value - total_investment) / total_investment) * 100
+        return self.portfolio.percentage_change
 
     def calculate_total_variation(self):
         """Calculate the total variation (profit or loss) of the portfolio."""
-        total_investment = self.calculate_total_investment()
-        total_value = self.calculate_total_value()
-        return total_value - total_investment
+        return self.portfolio.total_variation
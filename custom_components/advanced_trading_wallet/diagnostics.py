@@ -0,0 +1,17 @@
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN]["coordinator"]
+    return {
+        "entry": hass.data[DOMAIN].get(config_entry.entry_id, {}),
+        "stocks": coordinator.stocks,
+        "crypto": coordinator.crypto,
+        "api": coordinator.get_api_stats(),
+        "refresh": coordinator.get_refresh_stats(),
+    }
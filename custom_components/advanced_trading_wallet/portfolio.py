@@ -0,0 +1,30 @@
+class ATWPortfolioSnapshot:
+    """Portfolio aggregates computed in one scan of all positions."""
+
+    __slots__ = (
+        "generation",
+        "stocks_value",
+        "crypto_value",
+        "total_value",
+        "total_investment",
+        "total_variation",
+        "percentage_change",
+    )
+
+    def __init__(
+        self,
+        generation: int = 0,
+        stocks_value: float = 0,
+        crypto_value: float = 0,
+        total_investment: float = 0,
+    ):
+        """Initialize the snapshot and derive the totals."""
+        self.generation = generation
+        self.stocks_value = stocks_value
+        self.crypto_value = crypto_value
+        self.total_value = stocks_value + crypto_value
+        self.total_investment = total_investment
+        self.total_variation = self.total_value - total_investment
+        self.percentage_change = (
+            self.total_variation / total_investment * 100 if total_investment else 0
+        )
@@ -0,0 +1,313 @@
+import asyncio
+import math
+import random
+import time
+import zlib
+from .const import (
+    YAHOO_FINANCE_BASE_URL,
+    YAHOO_FINANCE_HISTORICAL_URL,
+    COINGECKO_BASE_URL,
+    LOGGER,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_YAHOO_BATCH_SIZE,
+    COINGECKO_MAX_PER_PAGE,
+    CACHE_TTL_QUOTE,
+    CACHE_TTL_HISTORICAL,
+    SYNTHETIC_TICK,
+    SENSOR_TYPES_STOCK,
+    SENSOR_TYPES_CRYPTO,
+)
+from .quote import QUOTE_TYPES, compile_extractors
+
+
+class ATWProvider:
+    """Base class describing an API provider and how to fetch quotes from it."""
+
+    # Name shown in the config flow and stored in config entries
+    name = None
+    # Asset types the provider serves, mapped to the sensor field schema
+    asset_types = {}
+    # Maximum number of symbols per request
+    batch_size = 1
+    # Request budget used by the client's rate limiter
+    rate_limit = DEFAULT_RATE_LIMIT
+    # Whether get_historical_data is supported
+    supports_historical = False
+
+    def __init__(self):
+        """Compile the sensor tables into field extractors."""
+        self._extractors = {
+            asset_type: compile_extractors(sensor_types)
+            for asset_type, sensor_types in self.asset_types.items()
+        }
+
+    def supports(self, asset_type: str) -> bool:
+        """Return True if the provider serves the asset type."""
+        return asset_type in self.asset_types
+
+    def sensor_types(self, asset_type: str) -> list:
+        """Return the sensor field schema for an asset type."""
+        return self.asset_types.get(asset_type, [])
+
+    def extract(self, asset_type: str, quote) -> tuple:
+        """Return all sensor values of a quote, ordered like sensor_types()."""
+        return tuple(extractor(quote) for extractor in self._extractors[asset_type])
+
+    def parse_quote(self, asset_type: str, raw: dict):
+        """Parse a flat provider quote dict into a compact quote record."""
+        return QUOTE_TYPES[asset_type].from_dict(raw)
+
+    async def async_fetch_quotes(
+        self,
+        client,
+        asset_type: str,
+        symbols: list[str],
+        results: dict,
+        currency: str = "usd",
+    ):
+        """Fetch quotes for symbols into results as quote records, keyed by symbol."""
+        raise NotImplementedError
+
+    async def async_fetch_historical(
+        self, client, asset_type: str, symbol: str, interval: str
+    ):
+        """Fetch historical data for a symbol."""
+        LOGGER.warning(f"{self.name} does not provide historical data.")
+        return None
+
+    @staticmethod
+    def chunks(symbols: list[str], size: int):
+        """Split symbols into lists of at most size items."""
+        for start in range(0, len(symbols), size):
+            yield symbols[start : start + size]
+
+
+class YahooFinanceProvider(ATWProvider):
+    """Stock quotes from the Yahoo Finance v7 quote endpoint."""
+
+    name = "Yahoo Finance"
+    asset_types = {"stock": SENSOR_TYPES_STOCK}
+    batch_size = DEFAULT_YAHOO_BATCH_SIZE
+    rate_limit = {"rate": 1.0, "capacity": 5}
+    supports_historical = True
+
+    async def async_fetch_quotes(
+        self, client, asset_type, symbols, results, currency="usd"
+    ):
+        """Fetch stock quotes in chunks of client.batch_size symbols per request."""
+        await asyncio.gather(
+            *(
+                self._async_fetch_chunk(client, chunk, results)
+                for chunk in self.chunks(symbols, client.batch_size)
+            )
+        )
+
+    async def _async_fetch_chunk(self, client, chunk: list[str], results: dict):
+        """Fetch one chunk of stock symbols and split it per symbol."""
+        symbols = ",".join(chunk)
+        async with client.request_semaphore:
+            json_data = await client.async_get_yahoo_json(
+                lambda crumb: f"{YAHOO_FINANCE_BASE_URL}{symbols}&crumb={crumb}",
+                symbols,
+                ttl=CACHE_TTL_QUOTE,
+            )
+        if not json_data:
+            return
+        LOGGER.debug(f"Stock data for {symbols}: {json_data}")
+
+        # Split the combined result back into one quote record per symbol
+        quotes = json_data.get("quoteResponse", {}).get("result") or []
+        quotes_by_symbol = {quote.get("symbol", "").upper(): quote for quote in quotes}
+        for symbol in chunk:
+            quote = quotes_by_symbol.get(symbol.upper())
+            if quote is None:
+                LOGGER.warning(f"No quote returned for stock: {symbol}")
+                continue
+            results[symbol] = self.parse_quote("stock", quote)
+
+    async def async_fetch_historical(self, client, asset_type, symbol, interval):
+        """Fetch the chart series for a stock."""
+        url = f"{YAHOO_FINANCE_HISTORICAL_URL}{symbol}?interval={interval}"
+        json_data = await client.async_get_yahoo_json(
+            lambda crumb: url, symbol, ttl=CACHE_TTL_HISTORICAL
+        )
+        if json_data:
+            LOGGER.debug(f"Historical data for {symbol}: {json_data}")
+        return json_data
+
+
+class CoinGeckoProvider(ATWProvider):
+    """Crypto market data from the CoinGecko markets endpoint."""
+
+    name = "CoinGecko"
+    asset_types = {"crypto": SENSOR_TYPES_CRYPTO}
+    batch_size = COINGECKO_MAX_PER_PAGE
+    rate_limit = {"rate": 0.25, "capacity": 5}
+    supports_historical = True
+
+    async def async_fetch_quotes(
+        self, client, asset_type, symbols, results, currency="usd"
+    ):
+        """Fetch market data for many coins using paged ids= requests."""
+        ids = {}
+        for crypto_symbol in symbols:
+            ids.setdefault(crypto_symbol.lower(), []).append(crypto_symbol)
+
+        await asyncio.gather(
+            *(
+                self._async_fetch_page(client, chunk, ids, results, currency)
+                for chunk in self.chunks(list(ids), client.batch_size)
+            )
+        )
+
+        for crypto_symbol in symbols:
+            if crypto_symbol not in results:
+                LOGGER.warning(f"No market data returned for crypto: {crypto_symbol}")
+
+    async def _async_fetch_page(
+        self, client, coin_ids: list[str], ids: dict, results: dict, currency: str
+    ):
+        """Fetch one page of market rows for up to client.batch_size ids."""
+        url = (
+            f"{COINGECKO_BASE_URL}/coins/markets?vs_currency={currency}"
+            f"&ids={','.join(coin_ids)}&per_page={self.batch_size}&page=1"
+        )
+        async with client.request_semaphore:
+            rows = await client.async_get_json(
+                url, f"{len(coin_ids)} coins", ttl=CACHE_TTL_QUOTE
+            )
+        LOGGER.debug(f"Crypto data for {', '.join(coin_ids)}: {rows}")
+
+        # Fan the rows back out by coin id as quote records
+        for row in rows or []:
+            for crypto_symbol in ids.get(row.get("id", ""), []):
+                coin = self.parse_quote("crypto", row)
+                coin.symbol = row.get("symbol", crypto_symbol).upper()
+                results[crypto_symbol] = coin
+
+    async def async_fetch_historical(self, client, asset_type, symbol, interval):
+        """Fetch the market chart for a coin."""
+        url = f"{COINGECKO_BASE_URL}/coins/{symbol.lower()}/market_chart?vs_currency=usd&days={interval}"
+        LOGGER.debug(f"Requesting crypto historical data from {url}")
+        json_data = await client.async_get_json(url, symbol, ttl=CACHE_TTL_HISTORICAL)
+        if json_data:
+            LOGGER.debug(f"Crypto historical data for {symbol}: {json_data}")
+        return json_data
+
+
+class SyntheticProvider(ATWProvider):
+    """Offline provider generating deterministic quotes for load testing.
+
+    Prices follow a smooth per-symbol wave with seeded noise that changes
+    every SYNTHETIC_TICK seconds, so identical symbols and ticks always produce
+    identical quotes and no network access is needed.
+    """
+
+    name = "Synthetic"
+    asset_types = {"stock": SENSOR_TYPES_STOCK, "crypto": SENSOR_TYPES_CRYPTO}
+    batch_size = 1000
+    rate_limit = {"rate": 10000.0, "capacity": 10000}
+
+    async def async_fetch_quotes(
+        self, client, asset_type, symbols, results, currency="usd"
+    ):
+        """Generate quotes, yielding to the event loop between chunks."""
+        tick = int(time.time() // SYNTHETIC_TICK)
+        generate = self._stock_quote if asset_type == "stock" else self._crypto_quote
+        for chunk in self.chunks(symbols, client.batch_size):
+            for symbol in chunk:
+                results[symbol] = self.parse_quote(asset_type, generate(symbol, tick))
+            await asyncio.sleep(0)
+
+    @staticmethod
+    def _price(symbol: str, tick: int, base: float):
+        """Return the price at a tick and the seeded generator for the tick."""
+        seed = zlib.crc32(symbol.upper().encode())
+        rng = random.Random(seed * 100003 + tick)
+        phase = (seed % 360) * math.pi / 180
+        wave = 0.05 * math.sin(tick / 240 + phase)
+        return base * (1 + wave + rng.uniform(-0.005, 0.005)), rng
+
+    def _stock_quote(self, symbol: str, tick: int) -> dict:
+        """Return a Yahoo-style quote for a stock."""
+        base_rng = random.Random(zlib.crc32(symbol.upper().encode()))
+        base = base_rng.uniform(5, 500)
+        shares = base_rng.randint(10_000_000, 5_000_000_000)
+        eps = base * base_rng.uniform(0.01, 0.08)
+        price, rng = self._price(symbol, tick, base)
+        return {
+            "symbol": symbol.upper(),
+            "shortName": f"{symbol.upper()} Synthetic",
+            "displayName": symbol.upper(),
+            "currency": "USD",
+            "marketState": "REGULAR",
+            "regularMarketTime": tick * SYNTHETIC_TICK,
+            "regularMarketPrice": round(price, 2),
+            "regularMarketDayHigh": round(price * (1 + rng.uniform(0, 0.02)), 2),
+            "regularMarketDayLow": round(price * (1 - rng.uniform(0, 0.02)), 2),
+            "regularMarketVolume": rng.randint(100_000, 50_000_000),
+            "bid": round(price * 0.9995, 2),
+            "ask": round(price * 1.0005, 2),
+            "bidSize": rng.randint(1, 40) * 100,
+            "askSize": rng.randint(1, 40) * 100,
+            "marketCap": round(price * shares),
+            "sharesOutstanding": shares,
+            "fiftyTwoWeekHigh": round(base * 1.08, 2),
+            "fiftyTwoWeekLow": round(base * 0.92, 2),
+            "fiftyDayAverage": round(base * 1.01, 2),
+            "twoHundredDayAverage": round(base, 2),
+            "averageDailyVolume3Month": shares // 200,
+            "averageDailyVolume10Day": shares // 180,
+            "epsTrailingTwelveMonths": round(eps, 2),
+            "trailingPE": round(price / eps, 2),
+            "bookValue": round(base * 0.4, 2),
+            "dividendRate": round(base * 0.02, 2),
+            "dividendYield": 2.0,
+            "averageAnalystRating": "2.0 - Buy",
+        }
+
+    def _crypto_quote(self, symbol: str, tick: int) -> dict:
+        """Return a CoinGecko-style market row for a coin."""
+        base_rng = random.Random(zlib.crc32(symbol.upper().encode()))
+        base = base_rng.uniform(0.01, 50_000)
+        supply = base_rng.uniform(1e6, 1e11)
+        price, rng = self._price(symbol, tick, base)
+        previous, _ = self._price(symbol, tick - 1440, base)
+        return {
+            "id": symbol.lower(),
+            "symbol": symbol.upper(),
+            "name": symbol.capitalize(),
+            "current_price": price,
+            "market_cap": price * supply,
+            "market_cap_rank": base_rng.randint(1, 1000),
+            "total_volume": price * supply * rng.uniform(0.01, 0.1),
+            "high_24h": max(price, previous) * 1.01,
+            "low_24h": min(price, previous) * 0.99,
+            "ath": base * 1.6,
+            "atl": base * 0.1,
+            "circulating_supply": supply,
+            "total_supply": supply * 1.2,
+            "fully_diluted_valuation": price * supply * 1.2,
+            "price_change_percentage_24h": (price - previous) / previous * 100,
+            "market_cap_change_24h": (price - previous) * supply,
+            "last_updated": tick * SYNTHETIC_TICK,
+        }
+
+
+PROVIDERS = {}
+
+
+def register_provider(provider: ATWProvider) -> ATWProvider:
+    """Add a provider to the registry under its name."""
+    PROVIDERS[provider.name] = provider
+    return provider
+
+
+def get_provider(name: str) -> ATWProvider | None:
+    """Return the registered provider with the given name."""
+    return PROVIDERS.get(name)
+
+
+register_provider(YahooFinanceProvider())
+register_provider(CoinGeckoProvider())
+register_provider(SyntheticProvider())
@@ -0,0 +1,86 @@
+from operator import attrgetter
+from .const import (
+    SENSOR_TYPES_STOCK,
+    SENSOR_TYPES_CRYPTO,
+    QUOTE_EXTRA_FIELDS_STOCK,
+    QUOTE_EXTRA_FIELDS_CRYPTO,
+)
+
+
+class ATWQuote:
+    """Compact quote record holding only the fields the sensors read.
+
+    Subclasses are generated from the sensor tables with one slot per field,
+    so a quote costs a fixed-size object instead of the provider's full JSON.
+    The dict-style get() and ``in`` keep call sites provider independent.
+    """
+
+    __slots__ = ()
+    fields = ()
+
+    @classmethod
+    def from_dict(cls, raw: dict):
+        """Build a quote from a provider's flat quote dict."""
+        quote = cls.__new__(cls)
+        for field in cls.fields:
+            setattr(quote, field, raw.get(field))
+        return quote
+
+    def get(self, key: str, default=None):
+        """Return a field value, or default if the field is unknown or empty."""
+        value = getattr(self, key, None) if key in self.fields else None
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the provider returned a value for the field."""
+        return self.get(key) is not None
+
+    def as_dict(self) -> dict:
+        """Return the non-empty fields as a dict."""
+        return {
+            field: getattr(self, field)
+            for field in self.fields
+            if getattr(self, field) is not None
+        }
+
+
+def make_quote_type(name: str, sensor_types: list, extra_fields: tuple) -> type:
+    """Create an ATWQuote subclass with a slot per sensor key and extra field."""
+    fields = tuple(
+        dict.fromkeys(
+            [*extra_fields, *(sensor_type["key"] for sensor_type in sensor_types)]
+        )
+    )
+    return type(name, (ATWQuote,), {"__slots__": fields, "fields": fields})
+
+
+ATWStockQuote = make_quote_type(
+    "ATWStockQuote", SENSOR_TYPES_STOCK, QUOTE_EXTRA_FIELDS_STOCK
+)
+ATWCryptoQuote = make_quote_type(
+    "ATWCryptoQuote", SENSOR_TYPES_CRYPTO, QUOTE_EXTRA_FIELDS_CRYPTO
+)
+
+QUOTE_TYPES = {"stock": ATWStockQuote, "crypto": ATWCryptoQuote}
+
+
+def stock_price(quote):
+    """Return the price for the market session: pre, post or regular."""
+    market_state = quote.marketState
+    if market_state in ("PRE", "PREPRE") and quote.preMarketPrice is not None:
+        return quote.preMarketPrice
+    if market_state in ("POST", "POSTPOST") and quote.postMarketPrice is not None:
+        return quote.postMarketPrice
+    return quote.regularMarketPrice
+
+
+# Sensor keys whose value is derived from several quote fields
+DERIVED_FIELDS = {"regularMarketPrice": stock_price}
+
+
+def compile_extractors(sensor_types: list) -> tuple:
+    """Compile a sensor table into one extractor function per sensor, in order."""
+    return tuple(
+        DERIVED_FIELDS.get(sensor_type["key"]) or attrgetter(sensor_type["key"])
+        for sensor_type in sensor_types
+    )
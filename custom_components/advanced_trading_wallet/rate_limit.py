@@ -0,0 +1,85 @@
+import asyncio
+import time
+from .const import LOGGER, DEFAULT_MAX_RATE_LIMIT_WAIT
+
+
+class ATWRateLimiter:
+    """Token bucket that spaces out requests to a single API provider."""
+
+    def __init__(self, name: str, rate: float, capacity: float):
+        """Initialize the limiter with a refill rate (tokens/s) and burst size."""
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self.deferred_requests = 0
+        self.rate_limited_responses = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last refill."""
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Return how long the next request would have to wait for a slot.
+
+        Tokens reserved by waiting callers make the balance negative, so the
+        wait also covers the callers queued ahead.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        return max(wait, self._blocked_until - now)
+
+    async def async_acquire(self, max_wait: float = DEFAULT_MAX_RATE_LIMIT_WAIT):
+        """Take a token, waiting up to max_wait seconds.
+
+        Returns False when no slot is available within max_wait, in which case
+        the caller should defer the request to a later refresh.
+        """
+        wait = self.wait_time()
+        if wait > max_wait:
+            self.deferred_requests += 1
+            LOGGER.debug(
+                f"{self.name}: deferring request, next slot in {wait:.1f} seconds"
+            )
+            return False
+        # Reserve the slot before sleeping, so concurrent callers compute their
+        # own later slots and sleep in parallel instead of queueing on a lock
+        self._tokens -= 1
+        if wait > 0:
+            self.total_wait += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the unused slot back
+                self._tokens += 1
+                raise
+        return True
+
+    def defer(self, retry_after: float):
+        """Block the provider for retry_after seconds after a rate limit response."""
+        now = time.monotonic()
+        self.rate_limited_responses += 1
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+        # Keep the slots already reserved by waiting callers
+        self._tokens = min(self._tokens, 0)
+        self._updated = now
+
+    def stats(self) -> dict:
+        """Return the limiter state for monitoring."""
+        wait_time = self.wait_time()
+        return {
+            "tokens": round(max(0, self._tokens), 2),
+            "capacity": self.capacity,
+            "rate": self.rate,
+            "wait_time": round(wait_time, 2),
+            "total_wait": round(self.total_wait, 2),
+            "deferred_requests": self.deferred_requests,
+            "rate_limited_responses": self.rate_limited_responses,
+        }
@@ -0,0 +1,130 @@
+import heapq
+from datetime import datetime, timedelta
+import homeassistant.util.dt as dt_util
+from .const import (
+    LOGGER,
+    MARKET_OPEN_STATES,
+    MARKET_SESSION_START,
+    DEFAULT_CLOSED_MARKET_INTERVAL,
+    SCHEDULER_TOLERANCE,
+)
+
+
+class ATWPollScheduler:
+    """Priority queue deciding which symbols are due on each coordinator tick.
+
+    Every symbol has its own refresh interval (its tier). On each tick only
+    the symbols whose due time has passed are dispatched. Stocks whose last
+    quote reported a closed market are additionally held back until a slow
+    heartbeat, or their exchange's next session start, whichever comes first.
+    """
+
+    def __init__(self, closed_interval: timedelta = DEFAULT_CLOSED_MARKET_INTERVAL):
+        """Initialize the scheduler."""
+        self.closed_interval = closed_interval
+        self._intervals = {}
+        self._next_due = {}
+        self._closed = set()
+        self._queue = []
+
+    def _push(self, symbol: str, due: datetime):
+        """Set the due time of a symbol; older queue items become stale."""
+        self._next_due[symbol] = due
+        heapq.heappush(self._queue, (due, symbol))
+
+    def set_intervals(self, intervals: dict, now: datetime, deferred=()):
+        """Set the refresh interval of every tracked symbol.
+
+        New symbols are due immediately unless listed in deferred (they
+        already have data), dropped symbols are forgotten and a shortened
+        interval brings the next poll forward.
+        """
+        for symbol in self._intervals.keys() - intervals.keys():
+            self._next_due.pop(symbol, None)
+            self._closed.discard(symbol)
+        for symbol, interval in intervals.items():
+            if symbol not in self._next_due:
+                self._push(symbol, now + interval if symbol in deferred else now)
+            elif interval < self._intervals.get(symbol, interval):
+                self._push(symbol, min(self._next_due[symbol], now + interval))
+        self._intervals = dict(intervals)
+
+    def min_interval(self) -> timedelta | None:
+        """Return the shortest tier interval, used as the coordinator tick."""
+        return min(self._intervals.values(), default=None)
+
+    def pop_due(self, now: datetime) -> set:
+        """Return the symbols due now and provisionally schedule their next poll."""
+        due = set()
+        horizon = now + SCHEDULER_TOLERANCE
+        while self._queue and self._queue[0][0] <= horizon:
+            due_time, symbol = heapq.heappop(self._queue)
+            if self._next_due.get(symbol) != due_time or symbol in due:
+                continue  # stale queue item
+            due.add(symbol)
+        for symbol in due:
+            self._push(symbol, now + self._intervals[symbol])
+        return due
+
+    def reschedule(self, symbol: str, now: datetime, quote: dict | None = None):
+        """Schedule the next poll of a fetched symbol from its latest quote."""
+        interval = self._intervals.get(symbol)
+        if interval is None:
+            return
+        next_due = now + interval
+        market_state = quote.get("marketState") if quote else None
+        if market_state is None or market_state in MARKET_OPEN_STATES:
+            self._closed.discard(symbol)
+        else:
+            self._closed.add(symbol)
+            next_due = max(
+                next_due,
+                min(now + self.closed_interval, self.next_session_start(quote, now)),
+            )
+            LOGGER.debug(
+                f"Market closed for {symbol} ({market_state}), next poll at {next_due}"
+            )
+        self._push(symbol, next_due)
+
+    def mark_due(self, now: datetime, symbols=None):
+        """Make the given symbols, or every tracked one, due on the next tick."""
+        for symbol in self._intervals if symbols is None else symbols:
+            if symbol in self._intervals:
+                self._push(symbol, now)
+
+    def retry(self, symbol: str, now: datetime):
+        """Make a symbol that failed to refresh due again on the next tick."""
+        if symbol in self._intervals:
+            self._push(symbol, now)
+
+    @staticmethod
+    def next_session_start(quote: dict, now: datetime) -> datetime:
+        """Return when the symbol's exchange next opens, on the next weekday.
+
+        Exchange holidays are not known; on those days the heartbeat poll sees
+        the market still closed and backs off again.
+        """
+        time_zone_name = quote.get("exchangeTimezoneName")
+        time_zone = (
+            time_zone_name and dt_util.get_time_zone(time_zone_name)
+        ) or dt_util.UTC
+        local_now = now.astimezone(time_zone)
+        start = local_now.replace(
+            hour=MARKET_SESSION_START.hour,
+            minute=MARKET_SESSION_START.minute,
+            second=0,
+            microsecond=0,
+        )
+        if start <= local_now:
+            start += timedelta(days=1)
+        while start.weekday() >= 5:
+            start += timedelta(days=1)
+        return start
+
+    def stats(self) -> dict:
+        """Return scheduler counters for monitoring."""
+        return {
+            "scheduled_symbols": len(self._intervals),
+            "closed_market_symbols": len(self._closed),
+            "tick": str(self.min_interval()),
+        }
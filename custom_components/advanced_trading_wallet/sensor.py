@@ -1,16 +1,25 @@
 import locale
 import homeassistant.util.dt as dt_util
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import (
     DOMAIN,
     LOGGER,
     DEFAULT_API_PROVIDER,
-    SENSOR_TYPES_STOCK,
-    SENSOR_TYPES_CRYPTO,
+    LISTENER_CONTEXT_PORTFOLIO,
+    LISTENER_CONTEXT_LEDGER,
+    SIGNAL_SYMBOLS_UPDATED,
+    DEFAULT_ENTITY_MODE,
+    ENTITY_MODE_COMPACT,
+    UNRECORDED_ATTRIBUTES,
 )
 from .coordinator import ATWCoordinator
+from .providers import get_provider
 
 # Set the locale to the system's default
 locale.setlocale(locale.LC_ALL, "")
@@ -22,65 +31,130 @@ async def async_setup_entry(hass, entry, async_add_entities):
     # Fetch per-entry data
     entry_data = hass.data[DOMAIN][entry.entry_id]
 
-    asset_sensors = []
-
-    # Create sensors for stocks
-    for stock_symbol in entry_data.get("stocks_to_track", "").split(","):
-        stock_symbol = stock_symbol.strip()
-        if not stock_symbol:
-            continue
-        api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
-        # Loop through each sensor type defined in SENSOR_TYPES_STOCK
-        for sensor_type in SENSOR_TYPES_STOCK:
-            asset_sensors.append(
-                ATWSensor(
-                    coordinator,
-                    stock_symbol,
-                    sensor_type["name"],
-                    sensor_type["key"],
-                    sensor_type.get("device_class"),
-                    coordinator.preferred_currency,
-                    api_provider,
-                )
+    # Unique IDs of the asset sensors this platform has added for the entry
+    added_unique_ids = set()
+
+    @callback
+    def async_sync_asset_sensors(removed: dict | None = None) -> list:
+        """Return the entry's missing asset sensors and drop those no longer used.
+
+        The wanted sensors follow the entry's symbols and its entity layout
+        options, so symbol edits and layout changes only add or remove the
+        entities that differ.
+        """
+        removed = removed or {}
+        entity_mode = entry.options.get("entity_mode", DEFAULT_ENTITY_MODE)
+        sensor_keys = entry.options.get("sensor_types")
+        tracked = {"stock": coordinator.stocks, "crypto": coordinator.crypto}
+        new_sensors = []
+        stale_unique_ids = set()
+        for asset_type in ("stock", "crypto"):
+            symbols = coordinator.symbol_index.entry_symbols(asset_type, entry.entry_id)
+            sensors = _create_asset_sensors(
+                coordinator,
+                entry.entry_id,
+                entry_data,
+                asset_type,
+                symbols,
+                entity_mode,
+                sensor_keys,
             )
-        # Create stock-specific total_amount and purchase_price sensors
-        asset_sensors.append(
-            StockAmountSensor(coordinator, stock_symbol, entry_data, entry.entry_id)
-        )
-        asset_sensors.append(
-            StockPurchasePriceSensor(
-                coordinator, stock_symbol, entry_data, entry.entry_id
+            wanted = {sensor.unique_id for sensor in sensors}
+            new_sensors.extend(
+                sensor for sensor in sensors if sensor.unique_id not in added_unique_ids
             )
-        )
 
-    # Create sensors for crypto
-    for crypto_symbol in entry_data.get("crypto_to_track", "").split(","):
-        crypto_symbol = crypto_symbol.strip()
-        if not crypto_symbol:
-            continue
-        api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
-        # Loop through each sensor type defined in SENSOR_TYPES_CRYPTO
-        for sensor_type in SENSOR_TYPES_CRYPTO:
-            asset_sensors.append(
-                ATWSensor(
-                    coordinator,
-                    crypto_symbol,
-                    sensor_type["name"],
-                    sensor_type["key"],
-                    sensor_type.get("device_class"),
-                    coordinator.preferred_currency,
-                    api_provider,
-                )
-            )
-        # Create crypto-specific total_amount and purchase_price sensors
-        asset_sensors.append(
-            CryptoAmountSensor(coordinator, crypto_symbol, entry_data, entry.entry_id)
-        )
-        asset_sensors.append(
-            CryptoPurchasePriceSensor(
-                coordinator, crypto_symbol, entry_data, entry.entry_id
+            # Every sensor either layout could have created for the symbols
+            all_symbols = list(symbols) + list(removed.get(asset_type, ()))
+            candidates = _create_asset_sensors(
+                coordinator, entry.entry_id, entry_data, asset_type, all_symbols
+            ) + _create_asset_sensors(
+                coordinator,
+                entry.entry_id,
+                entry_data,
+                asset_type,
+                all_symbols,
+                ENTITY_MODE_COMPACT,
             )
+            for sensor in candidates:
+                # Per-field sensors are shared by unique ID, keep them while
+                # another entry still tracks the symbol
+                if type(sensor) is ATWSensor and (
+                    coordinator.symbol_index.is_shared(asset_type, sensor._symbol)
+                    if sensor._symbol in symbols
+                    else sensor._symbol in tracked[asset_type]
+                ):
+                    continue
+                if sensor.unique_id not in wanted:
+                    stale_unique_ids.add(sensor.unique_id)
+
+        entity_registry = er.async_get(hass)
+        for registry_entry in er.async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        ):
+            if registry_entry.unique_id in stale_unique_ids:
+                entity_registry.async_remove(registry_entry.entity_id)
+        added_unique_ids.difference_update(stale_unique_ids)
+
+        # Drop the asset device of symbols no entry tracks any more
+        device_registry = dr.async_get(hass)
+        for asset_type, symbols in removed.items():
+            for symbol in symbols:
+                if symbol in tracked[asset_type]:
+                    continue
+                device = device_registry.async_get_device(
+                    identifiers={(DOMAIN, symbol)}
+                )
+                if device is not None:
+                    device_registry.async_remove_device(device.id)
+        added_unique_ids.update(sensor.unique_id for sensor in new_sensors)
+        return new_sensors
+
+    @callback
+    def async_symbols_updated(added: dict, removed: dict):
+        """Sync the asset entities after the entry's options changed."""
+        async_add_entities(async_sync_asset_sensors(removed))
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_SYMBOLS_UPDATED.format(entry.entry_id), async_symbols_updated
         )
+    )
+
+    # Create sensors for stocks and crypto
+    asset_sensors = async_sync_asset_sensors()
+
+    # Diagnostic sensor for the entry's effective refresh interval
+    asset_sensors.append(EffectiveIntervalSensor(coordinator, entry))
+
+    # One status sensor per provider in use, owned by one of its entries
+    api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
+
+    @callback
+    def async_add_provider_status_sensor():
+        """Add the status sensor of the entry's provider, owned by this entry."""
+        coordinator.provider_status_sensors[api_provider] = entry.entry_id
+        async_add_entities([ProviderStatusSensor(coordinator, api_provider)])
+
+    @callback
+    def async_release_provider_status_sensor():
+        """Hand the provider's status sensor over to another entry using it."""
+        coordinator.provider_status_adders.pop(entry.entry_id, None)
+        if coordinator.provider_status_sensors.get(api_provider) != entry.entry_id:
+            return
+        del coordinator.provider_status_sensors[api_provider]
+        for provider, async_add in coordinator.provider_status_adders.values():
+            if provider == api_provider:
+                async_add()
+                break
+
+    coordinator.provider_status_adders[entry.entry_id] = (
+        api_provider,
+        async_add_provider_status_sensor,
+    )
+    if api_provider not in coordinator.provider_status_sensors:
+        async_add_provider_status_sensor()
+    entry.async_on_unload(async_release_provider_status_sensor)
 
     # If "portfolio_sensors_created" is not already set, create portfolio sensors
     if not hass.data[DOMAIN].get("portfolio_sensors_created"):
@@ -93,16 +167,133 @@ async def async_setup_entry(hass, entry, async_add_entities):
             PercentageChangeSensor(hass, coordinator),
             TotalVariationSensor(hass, coordinator),
         ]
-        async_add_entities(portfolio_sensors, True)
+        async_add_entities(portfolio_sensors)
         hass.data[DOMAIN]["portfolio_sensors_created"] = True
 
-    async_add_entities(asset_sensors, True)
-
-    # Ensure the coordinator updates its data
-    await coordinator.async_request_refresh()
-
+    async_add_entities(asset_sensors)
+
+    # Entries loading together share one refresh of their new symbols
+    coordinator.async_schedule_startup_refresh()
+
+
+def _create_asset_sensors(
+    coordinator,
+    entry_id,
+    entry_data,
+    asset_type,
+    symbols,
+    entity_mode=DEFAULT_ENTITY_MODE,
+    sensor_keys=None,
+) -> list:
+    """Create the sensors of an entry for the given symbols of one asset type.
+
+    Without sensor_keys every sensor type the provider declares is used; the
+    first one, the price, is always included.
+    """
+    api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
+    provider = get_provider(api_provider)
+    sensor_types = provider.sensor_types(asset_type) if provider else []
+    slots = [
+        slot
+        for slot, sensor_type in enumerate(sensor_types)
+        if slot == 0 or sensor_keys is None or sensor_type["key"] in sensor_keys
+    ]
+    if asset_type == "stock":
+        amount_sensor, purchase_price_sensor = (
+            StockAmountSensor,
+            StockPurchasePriceSensor,
+        )
+    else:
+        amount_sensor, purchase_price_sensor = (
+            CryptoAmountSensor,
+            CryptoPurchasePriceSensor,
+        )
 
-class ATWSensor(CoordinatorEntity, SensorEntity):
+    sensors = []
+    for symbol in symbols:
+        if entity_mode == ENTITY_MODE_COMPACT and slots:
+            # One price entity carrying the other sensor types as attributes
+            sensors.append(
+                ATWAssetSensor(
+                    coordinator,
+                    symbol,
+                    sensor_types,
+                    slots,
+                    coordinator.preferred_currency,
+                    api_provider,
+                    entry_id,
+                )
+            )
+        else:
+            for slot in slots:
+                sensor_type = sensor_types[slot]
+                sensors.append(
+                    ATWSensor(
+                        coordinator,
+                        symbol,
+                        sensor_type["name"],
+                        sensor_type["key"],
+                        sensor_type.get("device_class"),
+                        coordinator.preferred_currency,
+                        api_provider,
+                        slot,
+                    )
+                )
+        # Create asset-specific total_amount and purchase_price sensors
+        sensors.append(amount_sensor(coordinator, symbol, entry_data, entry_id))
+        sensors.append(purchase_price_sensor(coordinator, symbol, entry_data, entry_id))
+    return sensors
+
+
+def _decimal_places(sensor_name: str) -> int:
+    """Return the decimal places used to format the values of a sensor type."""
+    name = sensor_name.lower()
+    if "amount" in name:
+        return 4
+    if "crypto" in name:
+        return 8
+    return 2
+
+
+class ATWCoordinatorEntity(CoordinatorEntity):
+    """Coordinator entity that only writes its state when it changed."""
+
+    _last_fingerprint = None
+    _unrecorded_attributes = UNRECORDED_ATTRIBUTES
+    # Decimal places of the formatted_value attribute
+    _decimal_places = 2
+    # Last (value, formatted value) pair, formatting runs once per value change
+    _formatted = (None, None)
+
+    def _format_value(self, value):
+        """Return a number formatted with locale grouping; other values unchanged."""
+        if not isinstance(value, (int, float)):
+            return value
+        cached_value, formatted_value = self._formatted
+        if value != cached_value or cached_value is None:
+            formatted_value = locale.format_string(
+                f"%.{self._decimal_places}f", value, grouping=True
+            )
+            self._formatted = (value, formatted_value)
+        return formatted_value
+
+    def _state_fingerprint(self):
+        """Return the values whose change requires a state write."""
+        return (self.available, self.native_value, self.extra_state_attributes)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the fingerprint differs from the last write."""
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._last_fingerprint:
+            self.coordinator.state_writes["skipped"] += 1
+            return
+        self._last_fingerprint = fingerprint
+        self.coordinator.state_writes["written"] += 1
+        self.async_write_ha_state()
+
+
+class ATWSensor(ATWCoordinatorEntity, SensorEntity):
     """Generic sensor for stock/crypto data."""
 
     def __init__(
@@ -114,9 +305,10 @@ class ATWSensor(CoordinatorEntity, SensorEntity):
         device_class=None,
         preferred_currency=None,
         api_provider=None,
+        slot=None,
     ):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=symbol)
         self._name = f"{symbol.upper()} {sensor_name}"
         self._symbol = symbol
         self._sensor_name = sensor_name
@@ -124,51 +316,60 @@ class ATWSensor(CoordinatorEntity, SensorEntity):
         self._device_class = device_class
         self._preferred_currency = preferred_currency.upper()
         self._api_provider = api_provider
+        # Position of this sensor's value in the coordinator's per-symbol row
+        self._slot = slot
         self._state = None
         self._attr_device_class = device_class
         self._last_updated = None
+        self._decimal_places = _decimal_places(sensor_name)
+        if device_class == SensorDeviceClass.MONETARY:
+            self._unit = self._preferred_currency
+        elif "percentage" in sensor_name.lower():
+            self._unit = "%"
+        else:
+            self._unit = None
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        data = self.coordinator.data.get(self._symbol)
-        if not data:
+    def _update_state(self):
+        """Take a new slot value as the state; a missing value keeps the last one."""
+        values = self.coordinator.sensor_values.get(self._symbol)
+        if not values:
             LOGGER.warning(
                 f"No data for symbol: {self._symbol}, using last known value."
             )
-            return self._state  # Return last known state
+            return
 
-        if self._api_provider == "Yahoo Finance":
-            data = data.get("quoteResponse", {}).get("result", [{}])[0]
-        elif self._api_provider == "CoinGecko":
-            data = data[0] if isinstance(data, list) else data
-        else:
-            LOGGER.error(f"Unknown API provider for {self._symbol}")
-            return self._state  # Return last known state
-
-        if self._data_key == "regularMarketPrice":
-            # Handle stock price based on market state
-            raw_value = self.get_stock_price(data)
-        else:
-            raw_value = data.get(self._data_key)
-
-        if raw_value is not None:
-            self._state = raw_value
-            self._last_updated = dt_util.utcnow()
-        else:
+        raw_value = values[self._slot]
+        if raw_value is None:
             LOGGER.warning(f"No data for {self._symbol}: {self._data_key}")
             # Do not update self._state if data is None
+        elif raw_value != self._state:
+            self._state = raw_value
+            self._last_updated = dt_util.utcnow()
+
+    async def async_added_to_hass(self) -> None:
+        """Take the current value before the first state write."""
+        self._update_state()
+        await super().async_added_to_hass()
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take the new value, then write the state if it changed."""
+        self._update_state()
+        super()._handle_coordinator_update()
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
         return self._state
 
-    def get_stock_price(self, data):
-        market_state = data.get("marketState")
-        if market_state in ["PRE", "PREPRE"] and "preMarketPrice" in data:
-            return data["preMarketPrice"]
-        elif market_state in ["POST", "POSTPOST"] and "postMarketPrice" in data:
-            return data["postMarketPrice"]
-        else:
-            return data.get("regularMarketPrice")
+    def _state_fingerprint(self):
+        """Return the slot value and staleness; last_updated alone never counts."""
+        values = self.coordinator.sensor_values.get(self._symbol)
+        return (
+            self.available,
+            values[self._slot] if values else None,
+            self._symbol in self.coordinator.stale_symbols,
+        )
 
     @property
     def name(self):
@@ -183,40 +384,18 @@ class ATWSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including a formatted value."""
-        raw_value = self.native_value
-
-        if isinstance(raw_value, (int, float)):
-            # Determine the number of decimal places based on asset type and sensor type
-            if "amount" in self._name.lower():
-                decimal_places = 4
-            elif "crypto" in self._name.lower():
-                decimal_places = 8
-            elif "percentage" in self._name.lower():
-                decimal_places = 2
-            else:
-                decimal_places = 2
-            formatted_value = locale.format_string(
-                f"%.{decimal_places}f", raw_value, grouping=True
-            )
-        else:
-            formatted_value = raw_value
-
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
             "symbol": self._symbol.upper(),
             "api_provider": self._api_provider,
             "last_updated": self._last_updated,
+            "stale": self._symbol in self.coordinator.stale_symbols,
         }
 
     @property
     def native_unit_of_measurement(self):
         """Return the unit of measurement."""
-        if self._device_class == SensorDeviceClass.MONETARY:
-            return self._preferred_currency
-        elif "percentage" in self._name.lower():
-            return "%"
-        else:
-            return None
+        return self._unit
 
     @property
     def device_info(self):
@@ -230,22 +409,81 @@ class ATWSensor(CoordinatorEntity, SensorEntity):
     @property
     def available(self):
         """Return True if sensor data is available."""
-        data = self.coordinator.data.get(self._symbol)
-        if not data:
+        values = self.coordinator.sensor_values.get(self._symbol)
+        if not values:
             return False
-        if self._api_provider == "Yahoo Finance":
-            data = data.get("quoteResponse", {}).get("result", [{}])[0]
-        elif self._api_provider == "CoinGecko":
-            data = data[0] if isinstance(data, list) else data
-        return self._data_key in data or self._data_key == "regularMarketPrice"
+        return (
+            values[self._slot] is not None or self._data_key == "regularMarketPrice"
+        )
+
+
+class ATWAssetSensor(ATWSensor):
+    """Compact asset sensor: the price, with the other sensor types as attributes."""
 
+    def __init__(
+        self,
+        coordinator,
+        symbol,
+        sensor_types,
+        slots,
+        preferred_currency,
+        api_provider,
+        entry_id,
+    ):
+        """Initialize the sensor from the provider's sensor types."""
+        price = sensor_types[0]
+        super().__init__(
+            coordinator,
+            symbol,
+            price["name"],
+            price["key"],
+            price.get("device_class"),
+            preferred_currency,
+            api_provider,
+            0,
+        )
+        self._entry_id = entry_id
+        # (key, slot) of every selected sensor type other than the price
+        self._attribute_slots = tuple(
+            (sensor_types[slot]["key"], slot) for slot in slots if slot != 0
+        )
 
-class StockAmountSensor(CoordinatorEntity, SensorEntity):
+    def _state_fingerprint(self):
+        """Return the price, the attribute values and staleness."""
+        values = self.coordinator.sensor_values.get(self._symbol)
+        return (
+            self.available,
+            tuple(values[slot] for _, slot in self._attribute_slots)
+            if values
+            else None,
+            values[0] if values else None,
+            self._symbol in self.coordinator.stale_symbols,
+        )
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return f"{self._symbol}_{self._entry_id}_asset"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the asset's other sensor types next to the common attributes."""
+        attributes = dict(super().extra_state_attributes)
+        values = self.coordinator.sensor_values.get(self._symbol)
+        if values:
+            for key, slot in self._attribute_slots:
+                attributes[key] = values[slot]
+        return attributes
+
+
+class StockAmountSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor for stock total amount owned."""
 
+    _decimal_places = 4
+
     def __init__(self, coordinator, stock_symbol, entry_data, config_entry_id):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_LEDGER)
         self._stock_symbol = stock_symbol
         self._name = f"{stock_symbol.upper()} Total Amount"
         self._state = None
@@ -272,10 +510,8 @@ class StockAmountSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        raw_value = self.native_value
-        formatted_value = locale.format_string("%.4f", raw_value, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self.native_value),
             "symbol": self._stock_symbol.upper(),
         }
 
@@ -289,12 +525,12 @@ class StockAmountSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class StockPurchasePriceSensor(CoordinatorEntity, SensorEntity):
+class StockPurchasePriceSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor for stock purchase price."""
 
     def __init__(self, coordinator, stock_symbol, entry_data, config_entry_id):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_LEDGER)
         self._stock_symbol = stock_symbol
         self._name = f"{stock_symbol.upper()} Purchase Price"
         self._state = None
@@ -326,10 +562,8 @@ class StockPurchasePriceSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        raw_value = self.native_value
-        formatted_value = locale.format_string("%.2f", raw_value, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self.native_value),
             "symbol": self._stock_symbol.upper(),
         }
 
@@ -343,12 +577,14 @@ class StockPurchasePriceSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class CryptoAmountSensor(CoordinatorEntity, SensorEntity):
+class CryptoAmountSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor for crypto total amount owned."""
 
+    _decimal_places = 4
+
     def __init__(self, coordinator, crypto_symbol, entry_data, config_entry_id):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_LEDGER)
         self._crypto_symbol = crypto_symbol
         self._name = f"{crypto_symbol.upper()} Total Amount"
         self._state = None
@@ -374,10 +610,8 @@ class CryptoAmountSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        raw_value = self.native_value
-        formatted_value = locale.format_string("%.4f", raw_value, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self.native_value),
             "symbol": self._crypto_symbol.upper(),
         }
 
@@ -391,12 +625,14 @@ class CryptoAmountSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class CryptoPurchasePriceSensor(CoordinatorEntity, SensorEntity):
+class CryptoPurchasePriceSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor for crypto purchase price."""
 
+    _decimal_places = 8
+
     def __init__(self, coordinator, crypto_symbol, entry_data, config_entry_id):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_LEDGER)
         self._crypto_symbol = crypto_symbol
         self._name = f"{crypto_symbol.upper()} Purchase Price"
         self._state = None
@@ -428,10 +664,8 @@ class CryptoPurchasePriceSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        raw_value = self.native_value
-        formatted_value = locale.format_string("%.8f", raw_value, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self.native_value),
             "symbol": self._crypto_symbol.upper(),
         }
 
@@ -445,13 +679,13 @@ class CryptoPurchasePriceSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class TotalPortfolioValueSensor(CoordinatorEntity, SensorEntity):
+class TotalPortfolioValueSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor to track the total value of stocks and crypto in the portfolio."""
 
     def __init__(self, hass, coordinator):
         """Initialize the sensor."""
         self.hass = hass
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_PORTFOLIO)
         self._name = "Total Portfolio Value"
         self._state = None
         self._preferred_currency = coordinator.preferred_currency
@@ -464,7 +698,7 @@ class TotalPortfolioValueSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the current state."""
-        self._state = self.coordinator.calculate_total_value()
+        self._state = self.coordinator.portfolio.total_value
         return self._state
 
     @property
@@ -475,9 +709,8 @@ class TotalPortfolioValueSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        formatted_value = locale.format_string("%.2f", self._state, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
         }
 
     @property
@@ -495,13 +728,13 @@ class TotalPortfolioValueSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class TotalStocksValueSensor(CoordinatorEntity, SensorEntity):
+class TotalStocksValueSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor to track the total value of stocks in the portfolio."""
 
     def __init__(self, hass, coordinator):
         """Initialize the sensor."""
         self.hass = hass
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_PORTFOLIO)
         self._name = "Total Stocks Value"
         self._state = None
         self._preferred_currency = coordinator.preferred_currency
@@ -514,33 +747,7 @@ class TotalStocksValueSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the current state."""
-        total_stocks_value = 0
-        # Iterate over all entries to calculate stock values
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            stock_amount_owned = entry_data.get("stock_amount_owned", 0)
-            for stock_symbol in entry_data.get("stocks_to_track", "").split(","):
-                stock_symbol = stock_symbol.strip()
-                if not stock_symbol:
-                    continue
-                # Fetch stock price from coordinator data
-                stock_data = self.coordinator.data.get(stock_symbol)
-                if stock_data and "quoteResponse" in stock_data:
-                    stock_info = stock_data["quoteResponse"]["result"][0]
-                    stock_price = stock_info.get("regularMarketPrice")
-                    if stock_price is None:
-                        # Handle pre/post market prices
-                        market_state = stock_info.get("marketState")
-                        if market_state in ["PRE", "PREPRE"]:
-                            stock_price = stock_info.get("preMarketPrice")
-                        elif market_state in ["POST", "POSTPOST"]:
-                            stock_price = stock_info.get("postMarketPrice")
-                    if stock_price is not None:
-                        total_stocks_value += stock_price * stock_amount_owned
-        self._state = total_stocks_value
+        self._state = self.coordinator.portfolio.stocks_value
         return self._state
 
     @property
@@ -551,9 +758,8 @@ class TotalStocksValueSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        formatted_value = locale.format_string("%.2f", self._state, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
         }
 
     @property
@@ -571,13 +777,13 @@ class TotalStocksValueSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class TotalCryptoValueSensor(CoordinatorEntity, SensorEntity):
+class TotalCryptoValueSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor to track the total value of crypto in the portfolio."""
 
     def __init__(self, hass, coordinator):
         """Initialize the sensor."""
         self.hass = hass
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_PORTFOLIO)
         self._name = "Total Crypto Value"
         self._state = None
         self._preferred_currency = coordinator.preferred_currency
@@ -590,28 +796,7 @@ class TotalCryptoValueSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the current state."""
-        total_crypto_value = 0
-        # Iterate over all entries to calculate crypto values
-        for entry_id, entry_data in self.hass.data[DOMAIN].items():
-            if entry_id in ("coordinator", "portfolio_sensors_created"):
-                continue
-            if not isinstance(entry_data, dict):
-                continue
-            crypto_amount_owned = entry_data.get("crypto_amount_owned", 0)
-            for crypto_symbol in entry_data.get("crypto_to_track", "").split(","):
-                crypto_symbol = crypto_symbol.strip()
-                if not crypto_symbol:
-                    continue
-                # Fetch crypto price from coordinator data
-                crypto_data = self.coordinator.data.get(crypto_symbol)
-                if crypto_data:
-                    crypto_info = (
-                        crypto_data[0] if isinstance(crypto_data, list) else crypto_data
-                    )
-                    crypto_price = crypto_info.get("current_price")
-                    if crypto_price is not None:
-                        total_crypto_value += crypto_price * crypto_amount_owned
-        self._state = total_crypto_value
+        self._state = self.coordinator.portfolio.crypto_value
         return self._state
 
     @property
@@ -622,9 +807,8 @@ class TotalCryptoValueSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        formatted_value = locale.format_string("%.2f", self._state, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
         }
 
     @property
@@ -642,13 +826,13 @@ class TotalCryptoValueSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class TotalInvestmentSensor(CoordinatorEntity, SensorEntity):
+class TotalInvestmentSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor to track the total investment value (stocks and crypto) in the portfolio."""
 
     def __init__(self, hass, coordinator):
         """Initialize the sensor."""
         self.hass = hass
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_PORTFOLIO)
         self._name = "Total Investment"
         self._state = None
         self._preferred_currency = coordinator.preferred_currency
@@ -661,7 +845,7 @@ class TotalInvestmentSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the current state."""
-        self._state = self.coordinator.calculate_total_investment()
+        self._state = self.coordinator.portfolio.total_investment
         return self._state
 
     @property
@@ -672,9 +856,8 @@ class TotalInvestmentSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        formatted_value = locale.format_string("%.2f", self._state, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
         }
 
     @property
@@ -692,13 +875,13 @@ class TotalInvestmentSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class PercentageChangeSensor(CoordinatorEntity, SensorEntity):
+class PercentageChangeSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor to track the percentage change in the portfolio value."""
 
     def __init__(self, hass, coordinator):
         """Initialize the sensor."""
         self.hass = hass
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_PORTFOLIO)
         self._name = "Percentage Change"
         self._state = None
 
@@ -710,7 +893,7 @@ class PercentageChangeSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the current state."""
-        self._state = self.coordinator.calculate_percentage_change()
+        self._state = self.coordinator.portfolio.percentage_change
         return self._state
 
     @property
@@ -721,9 +904,8 @@ class PercentageChangeSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        formatted_value = locale.format_string("%.2f", self._state, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
         }
 
     @property
@@ -741,13 +923,13 @@ class PercentageChangeSensor(CoordinatorEntity, SensorEntity):
         }
 
 
-class TotalVariationSensor(CoordinatorEntity, SensorEntity):
+class TotalVariationSensor(ATWCoordinatorEntity, SensorEntity):
     """Sensor to track the total variation (increase/decrease) in portfolio value."""
 
     def __init__(self, hass, coordinator):
         """Initialize the sensor."""
         self.hass = hass
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=LISTENER_CONTEXT_PORTFOLIO)
         self._name = "Total Variation"
         self._state = None
         self._preferred_currency = coordinator.preferred_currency
@@ -760,7 +942,7 @@ class TotalVariationSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the current state."""
-        self._state = self.coordinator.calculate_total_variation()
+        self._state = self.coordinator.portfolio.total_variation
         return self._state
 
     @property
@@ -771,9 +953,8 @@ class TotalVariationSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self):
         """Return extra state attributes, including formatted value."""
-        formatted_value = locale.format_string("%.2f", self._state, grouping=True)
         return {
-            "formatted_value": formatted_value,
+            "formatted_value": self._format_value(self._state),
         }
 
     @property
@@ -789,3 +970,104 @@ class TotalVariationSensor(CoordinatorEntity, SensorEntity):
             "name": "Portfolio",
             "manufacturer": "Advanced Trading Wallet",
         }
+
+
+class ProviderStatusSensor(ATWCoordinatorEntity, SensorEntity):
+    """Diagnostic sensor showing the circuit breaker state of an API provider."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # Limiter stats that drift with the clock and would write state every refresh
+    _volatile_limiter_stats = ("tokens", "wait_time")
+
+    def __init__(self, coordinator, api_provider):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._api_provider = api_provider
+        self._name = f"{api_provider} API Status"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    def native_value(self):
+        """Return the circuit breaker state."""
+        stats = self.coordinator.get_api_stats().get(self._api_provider, {})
+        return stats.get("circuit_breaker", {}).get("state", "closed")
+
+    @property
+    def extra_state_attributes(self):
+        """Return circuit breaker and rate limiter counters."""
+        stats = self.coordinator.get_api_stats().get(self._api_provider, {})
+        attributes = dict(stats.get("circuit_breaker", {}))
+        attributes.pop("state", None)
+        for key, value in stats.get("rate_limiter", {}).items():
+            if key not in self._volatile_limiter_stats:
+                attributes[f"rate_limit_{key}"] = value
+        return attributes
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return f"global_portfolio_{self._api_provider.lower().replace(' ', '_')}_api_status"
+
+    @property
+    def device_info(self):
+        """Return device info."""
+        return {
+            "identifiers": {(DOMAIN, "global_portfolio")},
+            "name": "Portfolio",
+            "manufacturer": "Advanced Trading Wallet",
+        }
+
+
+class EffectiveIntervalSensor(ATWCoordinatorEntity, SensorEntity):
+    """Diagnostic sensor showing the refresh interval an entry currently uses."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+
+    def __init__(self, coordinator, entry):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._entry_id = entry.entry_id
+        self._name = f"{entry.title} Effective Update Interval"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    def native_value(self):
+        """Return the held-symbol refresh interval in minutes."""
+        interval = self.coordinator.get_entry_interval(self._entry_id)
+        return round(interval.total_seconds() / 60, 2)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the adaptive controller state and the coordinator tick."""
+        controller = self.coordinator.adaptive_intervals.get(self._entry_id)
+        attributes = {
+            "adaptive": controller is not None,
+            "coordinator_tick": str(self.coordinator.update_interval),
+        }
+        if controller is not None:
+            attributes.update(controller.stats())
+        return attributes
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the sensor."""
+        return f"{self._entry_id}_effective_update_interval"
+
+    @property
+    def device_info(self):
+        """Return device info."""
+        return {
+            "identifiers": {(DOMAIN, "global_portfolio")},
+            "name": "Portfolio",
+            "manufacturer": "Advanced Trading Wallet",
+        }
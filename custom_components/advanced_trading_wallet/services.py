@@ -15,7 +15,7 @@ async def async_setup_services(
 
     async def handle_refresh_data(service_call: ServiceCall) -> None:
         """Handle the refresh data service."""
-        await coordinator.async_request_refresh()
+        await coordinator.async_force_refresh()
 
     async def handle_get_historical_data(service_call: ServiceCall) -> None:
         """Handle the get historical data service."""
@@ -50,7 +50,7 @@ async def async_setup_services(
 
         try:
             await coordinator.buy_stock(stock_symbol, amount, purchase_price)
-            await coordinator.async_request_refresh()
+            await coordinator.async_force_refresh([stock_symbol])
         except Exception as e:
             LOGGER.error(f"Error in buy_stock service: {e}")
 
@@ -63,7 +63,7 @@ async def async_setup_services(
 
         try:
             await coordinator.sell_stock(stock_symbol, amount)
-            await coordinator.async_request_refresh()
+            await coordinator.async_force_refresh([stock_symbol])
         except ValueError as e:
             LOGGER.error(f"Error in sell_stock service: {e}")
         except Exception as e:
@@ -81,7 +81,7 @@ async def async_setup_services(
 
         try:
             await coordinator.buy_crypto(crypto_symbol, amount, purchase_price)
-            await coordinator.async_request_refresh()
+            await coordinator.async_force_refresh([crypto_symbol])
         except Exception as e:
             LOGGER.error(f"Error in buy_crypto service: {e}")
 
@@ -94,7 +94,7 @@ async def async_setup_services(
 
         try:
             await coordinator.sell_crypto(crypto_symbol, amount)
-            await coordinator.async_request_refresh()
+            await coordinator.async_force_refresh([crypto_symbol])
         except ValueError as e:
             LOGGER.error(f"Error in sell_crypto service: {e}")
         except Exception as e:
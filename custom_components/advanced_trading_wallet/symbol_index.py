@@ -0,0 +1,87 @@
+from .const import DEFAULT_API_PROVIDER
+
+
+class ATWSymbolIndex:
+    """Index from tracked symbols to the config entries holding them.
+
+    The comma separated symbol list of an entry is parsed once, when the
+    entry is added, removed or changed, so that transactions and valuations
+    can look symbols up directly. Entry dicts are referenced, not copied, so
+    amounts and purchase prices stay current between changes.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.entries = {}
+        self.stocks = {}
+        self.crypto = {}
+        self._symbol_entries = {"stock": {}, "crypto": {}}
+        self._entry_symbols = {"stock": {}, "crypto": {}}
+
+    @staticmethod
+    def split_symbols(symbols: str) -> list[str]:
+        """Return the non-empty symbols of a comma separated list."""
+        return [symbol.strip() for symbol in symbols.split(",") if symbol.strip()]
+
+    def _providers(self, asset_type: str) -> dict:
+        """Return the symbol -> API provider map of an asset type."""
+        return self.stocks if asset_type == "stock" else self.crypto
+
+    def add_entry(self, entry_id: str, entry_data: dict):
+        """Index the symbols of one entry, replacing its previous version."""
+        self.remove_entry(entry_id)
+        self.entries[entry_id] = entry_data
+        api_provider = entry_data.get("api_provider", DEFAULT_API_PROVIDER)
+        for asset_type, key in (
+            ("stock", "stocks_to_track"),
+            ("crypto", "crypto_to_track"),
+        ):
+            symbols = tuple(self.split_symbols(entry_data.get(key, "")))
+            self._entry_symbols[asset_type][entry_id] = symbols
+            providers = self._providers(asset_type)
+            for symbol in symbols:
+                providers[symbol] = api_provider
+                self._symbol_entries[asset_type].setdefault(symbol, []).append(
+                    entry_id
+                )
+
+    def remove_entry(self, entry_id: str):
+        """Drop the symbols of one entry from the index."""
+        if self.entries.pop(entry_id, None) is None:
+            return
+        for asset_type in ("stock", "crypto"):
+            providers = self._providers(asset_type)
+            symbol_entries = self._symbol_entries[asset_type]
+            for symbol in self._entry_symbols[asset_type].pop(entry_id, ()):
+                entry_ids = symbol_entries[symbol]
+                entry_ids.remove(entry_id)
+                if entry_ids:
+                    # The most recently indexed entry decides the provider
+                    providers[symbol] = self.entries[entry_ids[-1]].get(
+                        "api_provider", DEFAULT_API_PROVIDER
+                    )
+                else:
+                    del symbol_entries[symbol]
+                    del providers[symbol]
+
+    def entry_symbols(self, asset_type: str, entry_id: str) -> tuple:
+        """Return the symbols of an asset type tracked by an entry."""
+        return self._entry_symbols[asset_type].get(entry_id, ())
+
+    def is_shared(self, asset_type: str, symbol: str) -> bool:
+        """Return True if more than one entry tracks a symbol."""
+        return len(self._symbol_entries[asset_type].get(symbol, ())) > 1
+
+    def find_entry(self, asset_type: str, symbol: str):
+        """Return (entry_id, entry_data) of the first entry tracking a symbol."""
+        entry_ids = self._symbol_entries[asset_type].get(symbol)
+        if not entry_ids:
+            return None, None
+        return entry_ids[0], self.entries[entry_ids[0]]
+
+    def positions(self, asset_type: str):
+        """Yield (symbol, entry_data) for every tracked symbol of every entry."""
+        for entry_id, symbols in self._entry_symbols[asset_type].items():
+            entry_data = self.entries[entry_id]
+            for symbol in symbols:
+                yield symbol, entry_data
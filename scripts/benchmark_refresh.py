@@ -0,0 +1,151 @@
+"""Benchmark the coordinator refresh against a local fake Yahoo/CoinGecko server.
+
+Every fake request takes a fixed latency, so the wall time of a refresh shows
+how well provider groups and request chunks overlap. Each symbol count is
+measured twice: with one request in flight per provider, and with the default
+per-provider concurrency. Provider rate limits are lifted so that only the
+fetch pipeline is measured.
+
+Requires Home Assistant in the Python environment. Run from the repository
+root:
+
+    python scripts/benchmark_refresh.py [--latency 0.2] [--counts 10,100,1000]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.advanced_trading_wallet import api, providers  # noqa: E402
+from custom_components.advanced_trading_wallet.const import (  # noqa: E402
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+)
+from custom_components.advanced_trading_wallet.coordinator import (  # noqa: E402
+    ATWCoordinator,
+)
+
+UNLIMITED_RATE = {"rate": 1e6, "capacity": 1e6}
+
+
+def make_app(latency: float) -> web.Application:
+    """Return a fake server answering quote and market requests after a delay."""
+
+    async def crumb(request):
+        return web.Response(text="benchmark-crumb")
+
+    async def quotes(request):
+        await asyncio.sleep(latency)
+        symbols = request.query.get("symbols", "").split(",")
+        result = [
+            {"symbol": symbol, "regularMarketPrice": 100.0, "marketState": "REGULAR"}
+            for symbol in symbols
+        ]
+        return web.json_response({"quoteResponse": {"result": result}})
+
+    async def markets(request):
+        await asyncio.sleep(latency)
+        ids = request.query.get("ids", "").split(",")
+        rows = [
+            {"id": coin_id, "symbol": coin_id[:4], "current_price": 1.0}
+            for coin_id in ids
+        ]
+        return web.json_response(rows)
+
+    app = web.Application()
+    app.router.add_get("/v1/test/getcrumb", crumb)
+    app.router.add_get("/v7/finance/quote", quotes)
+    app.router.add_get("/api/v3/coins/markets", markets)
+    return app
+
+
+async def async_refresh_time(
+    hass: HomeAssistant, count: int, max_concurrent_requests: int
+) -> tuple:
+    """Return (wall time, requests sent) of one refresh of count stocks and coins."""
+    coordinator = ATWCoordinator(hass)
+    for api_provider in ("Yahoo Finance", "CoinGecko"):
+        coordinator.api_clients[api_provider] = api.ATWAPIClient(
+            hass,
+            api_provider,
+            max_concurrent_requests=max_concurrent_requests,
+            session=coordinator.session,
+        )
+    coordinator.register_entry(
+        "stocks",
+        {
+            "api_provider": "Yahoo Finance",
+            "stocks_to_track": ",".join(f"S{index}" for index in range(count)),
+        },
+    )
+    coordinator.register_entry(
+        "crypto",
+        {
+            "api_provider": "CoinGecko",
+            "crypto_to_track": ",".join(f"coin{index}" for index in range(count)),
+        },
+    )
+    started = time.perf_counter()
+    data = await coordinator._async_update_data()
+    elapsed = time.perf_counter() - started
+    if len(data) != 2 * count:
+        raise RuntimeError(f"Fetched {len(data)} of {2 * count} symbols")
+    return elapsed, coordinator.refresh_stats["requests_sent"]
+
+
+async def async_main(latency: float, counts: list[int]):
+    """Run the benchmark for every symbol count and print a table."""
+    runner = web.AppRunner(make_app(latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    # Point the providers at the fake server and lift their rate limits
+    providers.YAHOO_FINANCE_BASE_URL = f"{base_url}/v7/finance/quote?symbols="
+    providers.COINGECKO_BASE_URL = f"{base_url}/api/v3"
+    api.GET_CRUMB_URL = f"{base_url}/v1/test/getcrumb"
+    providers.YahooFinanceProvider.rate_limit = UNLIMITED_RATE
+    providers.CoinGeckoProvider.rate_limit = UNLIMITED_RATE
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        print(f"latency={latency}s per request")
+        print(
+            f"{'symbols':>8} {'requests':>9} {'wall (1)':>9}"
+            f" {f'wall ({DEFAULT_MAX_CONCURRENT_REQUESTS})':>9}"
+        )
+        for count in counts:
+            serial, _ = await async_refresh_time(hass, count, 1)
+            # requests_sent also counts a crumb request while none is stored
+            elapsed, requests_sent = await async_refresh_time(
+                hass, count, DEFAULT_MAX_CONCURRENT_REQUESTS
+            )
+            print(
+                f"{2 * count:>8} {requests_sent:>9} {serial:>8.2f}s"
+                f" {elapsed:>8.2f}s"
+            )
+        await hass.async_stop(force=True)
+    await runner.cleanup()
+
+
+def main():
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--counts", default="10,50,100,250,500,1000,2000")
+    args = parser.parse_args()
+    counts = [int(count) for count in args.counts.split(",")]
+    asyncio.run(async_main(args.latency, counts))
+
+
+if __name__ == "__main__":
+    main()